@@ -3,39 +3,88 @@
 Generate LangGraph visualization
 """
 import os
+import json
+import shutil
+import hashlib
+import subprocess
+import tempfile
 from src.services.conversation import FrenchNewsConversationAgent
-from langchain_core.runnables.graph import MermaidDrawMethod 
+from langchain_core.runnables.graph import MermaidDrawMethod
+
+DIAGRAM_MD = "langgraph_diagram.md"
+DIAGRAM_PNG = "langgraph_diagram.png"
+
+
+def _sha256_of_file(path: str) -> str:
+    if not os.path.exists(path):
+        return ""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _render_with_mmdc(mermaid_code: str):
+    """Render the PNG with mermaid-cli, reusing an installed Chromium"""
+    puppeteer_config = {"args": ["--no-sandbox"]}
+    chromium_path = os.getenv("PUPPETEER_EXECUTABLE_PATH", shutil.which("chromium") or "")
+    if chromium_path:
+        puppeteer_config["executablePath"] = chromium_path
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_path = os.path.join(tmp_dir, "diagram.mmd")
+        config_path = os.path.join(tmp_dir, "puppeteer.json")
+        with open(source_path, "w") as f:
+            f.write(mermaid_code)
+        with open(config_path, "w") as f:
+            json.dump(puppeteer_config, f)
+
+        subprocess.run(
+            ["mmdc", "-i", source_path, "-o", DIAGRAM_PNG, "--puppeteerConfigFile", config_path, "--quiet"],
+            check=True
+        )
+
 
 def main():
     # We can use a dummy API key just for graph generation
     dummy_api_key = "dummy-key-for-graph-generation"
-    
+
     print("🚀 Creating conversation agent (for graph structure only)...")
     agent = FrenchNewsConversationAgent(dummy_api_key)
-    
+
     print("📊 Generating graph visualization...")
-    
+
     try:
-        # Generate PNG image using local Pyppeteer method
-        print("🔄 Using local browser rendering (Pyppeteer)...")
-        png_data = agent.graph.get_graph().draw_mermaid_png(draw_method=MermaidDrawMethod.PYPPETEER,)
-        
-        # Save PNG to file
-        with open("langgraph_diagram.png", "wb") as f:
-            f.write(png_data)
-        
-        print("✅ PNG diagram generated!")
-        print("💾 Saved to langgraph_diagram.png")
-        
-        # Also generate mermaid code for reference
+        # Mermaid code first, it is cheap and decides whether the PNG needs rendering
         mermaid_code = agent.graph.get_graph().draw_mermaid()
-        with open("langgraph_diagram.md", "w") as f:
-            f.write("```mermaid\n")
-            f.write(mermaid_code)
-            f.write("\n```")
-        
-        print("📝 Mermaid code also saved to langgraph_diagram.md")
-        
+        markdown = f"```mermaid\n{mermaid_code}\n```"
+
+        unchanged = (
+            os.path.exists(DIAGRAM_PNG)
+            and _sha256_of_file(DIAGRAM_MD) == hashlib.sha256(markdown.encode()).hexdigest()
+        )
+
+        if unchanged:
+            print(f"✅ Graph unchanged, keeping existing {DIAGRAM_PNG}")
+            return
+
+        if shutil.which("mmdc"):
+            print("🔄 Using mermaid-cli rendering...")
+            _render_with_mmdc(mermaid_code)
+        else:
+            # Fall back to launching a browser through Pyppeteer
+            print("🔄 Using local browser rendering (Pyppeteer)...")
+            png_data = agent.graph.get_graph().draw_mermaid_png(draw_method=MermaidDrawMethod.PYPPETEER,)
+            with open(DIAGRAM_PNG, "wb") as f:
+                f.write(png_data)
+
+        print("✅ PNG diagram generated!")
+        print(f"💾 Saved to {DIAGRAM_PNG}")
+
+        # Written last, a matching .md means the PNG was rendered from it
+        with open(DIAGRAM_MD, "w") as f:
+            f.write(markdown)
+
+        print(f"📝 Mermaid code saved to {DIAGRAM_MD}")
+
     except Exception as e:
         print(f"❌ Error: {e}")
 
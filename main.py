@@ -19,11 +19,17 @@ def main():
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
     
+    # The file watcher is for development only, production runs uvloop + httptools workers
     uvicorn.run(
         "src.api.main:app",
         host=host,
         port=port,
-        reload=True,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        reload=os.getenv("ENV") == "dev",
+        limit_concurrency=int(os.getenv("LIMIT_CONCURRENCY", 200)),
+        backlog=int(os.getenv("BACKLOG", 2048)),
         log_level="info"
     )
 
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+One-off metadata backfill for rows stored before the numeric metadata fields
+Articles get published_ts/created_ts, conversations and messages get their type
+and numeric timestamps, so the filtered reads in the database client see them.
+Safe to run more than once, rows that already have the fields are left alone.
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the project root to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from dotenv import load_dotenv
+from src.database.client import db_client
+
+load_dotenv()
+
+PAGE_SIZE = 500
+
+
+def _epoch(iso_value: str) -> float:
+    # Legacy timestamps are naive local-time ISO strings from datetime.now()
+    return datetime.fromisoformat(iso_value).timestamp()
+
+
+def _article_fields(metadata: dict) -> dict:
+    fields = {}
+    if "published_ts" not in metadata and metadata.get("published_at"):
+        fields["published_ts"] = int(_epoch(metadata["published_at"]))
+    if "created_ts" not in metadata and metadata.get("created_at"):
+        fields["created_ts"] = int(_epoch(metadata["created_at"]))
+    return fields
+
+
+def _conversation_fields(metadata: dict) -> dict:
+    fields = {}
+    if "role" in metadata:
+        # Message row
+        if metadata.get("type") != "message":
+            fields["type"] = "message"
+        if "created_ms" not in metadata:
+            if "created_ts" in metadata:
+                # Written in milliseconds under the old field name
+                fields["created_ms"] = metadata["created_ts"]
+            elif metadata.get("created_at"):
+                fields["created_ms"] = int(_epoch(metadata["created_at"]) * 1000)
+    else:
+        # Conversation header row
+        if metadata.get("type") != "conversation":
+            fields["type"] = "conversation"
+        for field in ("created", "updated"):
+            if f"{field}_ts" not in metadata and metadata.get(f"{field}_at"):
+                fields[f"{field}_ts"] = int(_epoch(metadata[f"{field}_at"]))
+    return fields
+
+
+def backfill(collection, fields_for) -> int:
+    """Add the missing fields page by page, returns the number of updated rows"""
+    updated = 0
+    offset = 0
+    while True:
+        page = collection.get(limit=PAGE_SIZE, offset=offset, include=["metadatas"])
+        if not page["ids"]:
+            return updated
+
+        ids = []
+        metadatas = []
+        for row_id, metadata in zip(page["ids"], page["metadatas"]):
+            fields = fields_for(metadata or {})
+            if fields:
+                ids.append(row_id)
+                metadatas.append(fields)
+
+        # update() merges the given keys into the existing metadata
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            updated += len(ids)
+        offset += len(page["ids"])
+
+
+def main():
+    print("Backfilling article metadata...")
+    print(f"Updated {backfill(db_client.news_collection, _article_fields)} articles")
+    print("Backfilling conversation metadata...")
+    print(f"Updated {backfill(db_client.conversations_collection, _conversation_fields)} conversation rows")
+
+
+if __name__ == "__main__":
+    main()
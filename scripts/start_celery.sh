@@ -23,6 +23,6 @@ uv run celery -A src.celery_app flower --port=5555 &
 
 echo "✅ All Celery services started!"
 echo "📊 Flower monitoring: http://localhost:5555"
-echo "🔄 News processing will run every 30 seconds"
+echo "🔄 News feeds are checked every minute, processing runs when they change"
 echo ""
 echo "To stop all services: pkill -f celery"
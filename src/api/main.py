@@ -1,13 +1,19 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 import os
+import time
+import functools
+import asyncio
 import logging
+import orjson
 from contextlib import asynccontextmanager
 
 from src.services.conversation import FrenchNewsConversationAgent
-from src.services.news_processor import news_processor
+from src.services.embeddings import embedding_service
+from src.services.cache import get_cached, set_cached, NEWS_CACHE_TTL, ARTICLE_CACHE_TTL
 from src.database.client import db_client
 from src.celery_app import celery_app
 
@@ -18,6 +24,14 @@ logger = logging.getLogger(__name__)
 # Global conversation agent
 conversation_agent = None
 
+# Last collected Celery inspect results as (monotonic timestamp, payload), by cache key
+CELERY_STATUS_TTL = 2
+_celery_status: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+# Last readiness probe result as (monotonic timestamp, payload)
+HEALTH_CHECK_TTL = 2
+_last_health: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -27,12 +41,21 @@ async def lifespan(app: FastAPI):
     if not openai_api_key:
         raise ValueError("OPENAI_API_KEY environment variable is required")
     
+    # One long-lived database client for all requests
+    await db_client.connect()
+    app.state.db = db_client
+
     conversation_agent = FrenchNewsConversationAgent(openai_api_key)
+
+    # Pay the embedding model's first-call setup before serving traffic
+    await asyncio.to_thread(embedding_service.create_embedding, "warmup")
+
     logger.info("Application started successfully")
     
     yield
     
     # Shutdown
+    await db_client.disconnect()
     logger.info("Application shutting down")
 
 
@@ -40,7 +63,8 @@ app = FastAPI(
     title="French News Discussion API",
     description="API for discussing French news at B1 level using LangGraph and Celery",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -93,18 +117,42 @@ async def root():
         "status": "running",
         "endpoints": [
             "POST /chat - Start or continue a conversation",
+            "POST /chat/stream - Same as /chat, streamed as NDJSON",
+            "GET /chat/cache-stats - Get chat cache hit counters",
             "GET /conversation/{conversation_id} - Get conversation history",
             "POST /process-news - Process daily news",
             "GET /news - Get recent news articles",
             "GET /celery/status - Get Celery worker status",
             "POST /celery/trigger-news-fetch - Manually trigger news fetching",
             "GET /celery/task/{task_id} - Get task status",
-            "GET /health - Health check"
+            "GET /health - Health check",
+            "GET /livez - Liveness probe",
+            "GET /readyz - Readiness probe"
+        ]
+    }
+
+
+def _format_chat_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape an agent chat result for the API"""
+    return {
+        "response": result["response"],
+        "conversation_id": result["conversation_id"],
+        "relevant_articles": result["relevant_articles"]["documents"][0] if result["relevant_articles"] else [],
+        # Format sources as plain dicts matching NewsSource,
+        # the response is serialized directly instead of being validated again
+        "sources_used": [
+            {
+                "id": source["id"],
+                "title_fr": source["title_fr"],
+                "url": source["url"],
+                "published_at": source["published_at"][:10] if source["published_at"] else ""
+            }
+            for source in result.get("sources_used", [])
         ]
     }
 
 
-@app.post("/chat", response_model=ChatResponse)
+@app.post("/chat", response_model=None, responses={200: {"model": ChatResponse}})
 async def chat(message: ChatMessage):
     """Start or continue a conversation about French news"""
     if not conversation_agent:
@@ -115,23 +163,34 @@ async def chat(message: ChatMessage):
         message.conversation_id
     )
 
-    if result["relevant_articles"]:
-        result["relevant_articles"] = result["relevant_articles"]["documents"][0]
-
-    # Format sources for API response
-    sources_formatted = []
-    for source in result.get("sources_used", []):
-        sources_formatted.append(NewsSource(
-            id=source["id"],
-            title_fr=source["title_fr"],
-            url=source["url"],
-            published_at=source["published_at"][:10] if source["published_at"] else ""
-        ))
-    
-    result["sources_used"] = sources_formatted
+    return ORJSONResponse(_format_chat_result(result))
 
-    return ChatResponse(**result)
 
+@app.post("/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """Same as /chat, streamed as newline-delimited JSON token events and a final done event"""
+    if not conversation_agent:
+        raise HTTPException(status_code=500, detail="Conversation agent not initialized")
+
+    async def events():
+        async for event in conversation_agent.chat_stream(message.message, message.conversation_id):
+            if event["type"] == "done":
+                event = {"type": "done", **_format_chat_result(event)}
+            yield orjson.dumps(event) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/chat/cache-stats")
+async def chat_cache_stats():
+    """Get hit/miss counters for the chat caches"""
+    if not conversation_agent:
+        raise HTTPException(status_code=500, detail="Conversation agent not initialized")
+
+    return {
+        "semantic_cache": conversation_agent.response_cache.stats(),
+        "node_cache": conversation_agent.node_cache.stats()
+    }
 
 
 @app.get("/conversation/{conversation_id}")
@@ -156,21 +215,18 @@ async def get_conversation(conversation_id: str):
 
 
 @app.post("/process-news")
-async def process_news(
-    request: NewsProcessingRequest, 
-    background_tasks: BackgroundTasks
-):
+async def process_news(request: NewsProcessingRequest):
     """Process daily news articles"""
     try:
-        # Run news processing in background
-        background_tasks.add_task(
-            news_processor.process_daily_news, 
-            request.limit
-        )
+        from src.tasks.news_tasks import fetch_and_process_news
+
+        # Run news processing on a Celery worker, off the API event loop
+        task = fetch_and_process_news.delay(request.limit)
         
         return {
             "message": f"News processing started for {request.limit} articles",
-            "status": "processing"
+            "task_id": task.id,
+            "status": "queued"
         }
     
     except Exception as e:
@@ -178,88 +234,184 @@ async def process_news(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _format_news_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a stored article for the /news list"""
+    content = article["content"]
+    return {
+        "id": article["id"],
+        "title": article["title"],
+        "title_fr": article["titleFr"],
+        "url": article["url"],
+        "published_at": article["publishedAt"].isoformat(),
+        "content_preview": content[:200] + "..." if len(content) > 200 else content
+    }
+
+
+def _serialize_news_articles(articles: List[Dict[str, Any]]) -> bytes:
+    return orjson.dumps([_format_news_article(article) for article in articles])
+
+
 @app.get("/news")
 async def get_recent_news(limit: int = 20):
     """Get recent news articles"""
+    cache_key = f"news:recent:{limit}"
+    cached = await get_cached(cache_key)
+    if cached:
+        return Response(content=cached, media_type="application/json")
+
     try:
-        async with db_client:
-            articles = await db_client.get_recent_news_articles(limit)
+        articles = await app.state.db.get_recent_news_articles(limit)
         
-        return [
-            {
-                "id": article["id"],
-                "title": article["title"],
-                "title_fr": article["titleFr"],
-                "url": article["url"],
-                "published_at": article["publishedAt"].isoformat(),
-                "content_preview": article["content"][:200] + "..." if len(article["content"]) > 200 else article["content"]
-            }
-            for article in articles
-        ]
+        # Large pages are formatted off the event loop so concurrent chats aren't stalled
+        if len(articles) > 32:
+            content = await asyncio.to_thread(_serialize_news_articles, articles)
+        else:
+            content = _serialize_news_articles(articles)
     
     except Exception as e:
         logger.error(f"Get news error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    await set_cached(cache_key, content, NEWS_CACHE_TTL)
+    return Response(content=content, media_type="application/json")
 
-@app.get("/news/{article_id}")
+
+@app.get("/news/{article_id}", response_model=NewsArticleResponse)
 async def get_article(article_id: str):
     """Get a specific news article"""
+    cache_key = f"news:article:{article_id}"
+    cached = await get_cached(cache_key)
+    if cached:
+        return Response(content=cached, media_type="application/json")
+
     try:
-        async with db_client:
-            # We need to implement this method in the database client
-            # For now, let's return an error
-            raise HTTPException(status_code=501, detail="Not implemented yet")
+        article = await app.state.db.get_news_article_by_id(article_id)
     
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"Get article error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    content = orjson.dumps(NewsArticleResponse(
+        id=article["id"],
+        title=article["title"],
+        title_fr=article["titleFr"],
+        content=article["content"],
+        content_fr=article["contentFr"],
+        url=article["url"],
+        published_at=article["publishedAt"].isoformat()
+    ).model_dump())
+    await set_cached(cache_key, content, ARTICLE_CACHE_TTL)
+    return Response(content=content, media_type="application/json")
+
+
+async def _check_health() -> Dict[str, Any]:
+    """Probe dependencies, serving the last result for a couple of seconds"""
+    global _last_health
+    checked_at, payload = _last_health
+    if payload is not None and time.monotonic() - checked_at < HEALTH_CHECK_TTL:
+        return payload
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
     try:
         # Test database connection
-        async with db_client:
-            pass
+        await app.state.db.ping()
         
-        return {
+        payload = {
             "status": "healthy",
             "database": "connected",
             "conversation_agent": "initialized" if conversation_agent else "not_initialized"
         }
     
     except Exception as e:
-        return {
+        payload = {
             "status": "unhealthy",
             "error": str(e)
         }
 
+    _last_health = (time.monotonic(), payload)
+    return payload
+
+
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe - the process is up and serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe - dependencies are reachable"""
+    payload = await _check_health()
+    if payload["status"] != "healthy":
+        return ORJSONResponse(payload, status_code=503)
+    return payload
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return await _check_health()
+
 
 # Celery-related endpoints
+@functools.cache
+def _registered_tasks() -> List[str]:
+    """Registered task names, they don't change at runtime"""
+    return sorted(celery_app.tasks.keys())
+
+
+async def _collect_celery_status(include_scheduled: bool = False) -> Dict[str, Any]:
+    """
+    Collect worker inspect results, cached for a couple of seconds.
+    The inspect calls are blocking broadcasts, so they run in threads and in parallel.
+    """
+    cache_key = "celery:status:scheduled" if include_scheduled else "celery:status"
+    collected_at, payload = _celery_status.get(cache_key, (0.0, None))
+    if payload is not None and time.monotonic() - collected_at < CELERY_STATUS_TTL:
+        return payload
+
+    # Shared between API replicas through Redis
+    cached = await get_cached(cache_key)
+    if cached:
+        payload = orjson.loads(cached)
+    else:
+        inspect = celery_app.control.inspect()
+        calls = [inspect.active, inspect.stats]
+        if include_scheduled:
+            calls.append(inspect.scheduled)
+
+        results = await asyncio.gather(*(asyncio.to_thread(call) for call in calls))
+        payload = {
+            "active_tasks": results[0] or {},
+            "worker_stats": results[1] or {}
+        }
+        if include_scheduled:
+            payload["scheduled_tasks"] = results[2] or {}
+        await set_cached(cache_key, orjson.dumps(payload, default=str), CELERY_STATUS_TTL)
+
+    _celery_status[cache_key] = (time.monotonic(), payload)
+    return payload
+
+
 @app.get("/celery/status")
-async def celery_status():
-    """Get Celery worker and task status"""
+async def celery_status(registered: bool = False, scheduled: bool = False):
+    """
+    Get Celery worker and task status
+    Registered and scheduled tasks are only included on request (?registered=1, ?scheduled=1)
+    """
     try:
-        # Get active tasks
-        active_tasks = celery_app.control.inspect().active()
-        
-        # Get worker stats
-        worker_stats = celery_app.control.inspect().stats()
-        
-        # Get scheduled tasks
-        scheduled_tasks = celery_app.control.inspect().scheduled()
-        
-        return {
-            "status": "running" if worker_stats else "no_workers",
-            "active_tasks": active_tasks or {},
-            "worker_stats": worker_stats or {},
-            "scheduled_tasks": scheduled_tasks or {},
-            "registered_tasks": list(celery_app.tasks.keys())
+        status = await _collect_celery_status(include_scheduled=scheduled)
+
+        response = {
+            "status": "running" if status["worker_stats"] else "no_workers",
+            **status
         }
+        if registered:
+            response["registered_tasks"] = _registered_tasks()
+
+        return response
         
     except Exception as e:
         logger.error(f"Celery status error: {e}")
@@ -296,12 +448,18 @@ async def get_task_status(task_id: str):
         
         task_result = AsyncResult(task_id, app=celery_app)
         
-        return {
+        status = {
             "task_id": task_id,
             "status": task_result.status,
             "result": task_result.result if task_result.ready() else None,
             "traceback": task_result.traceback if task_result.failed() else None
         }
+
+        # Terminal results are handed out once, then dropped to keep Redis memory bounded
+        if task_result.ready():
+            task_result.forget()
+
+        return status
         
     except Exception as e:
         logger.error(f"Task status error: {e}")
@@ -314,6 +472,11 @@ if __name__ == "__main__":
         "src.api.main:app",
         host="0.0.0.0", 
         port=8000,
-        reload=True,
-        reload_dirs=["src"]
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        reload=os.getenv("ENV") == "dev",
+        reload_dirs=["src"],
+        limit_concurrency=int(os.getenv("LIMIT_CONCURRENCY", 200)),
+        backlog=int(os.getenv("BACKLOG", 2048))
     )
\ No newline at end of file
@@ -1,10 +1,14 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import import_modules, worker_process_init
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Prefork pool size, set it here rather than with --concurrency so the embedding threads follow it
+WORKER_CONCURRENCY = int(os.getenv('CELERY_WORKER_CONCURRENCY', os.cpu_count() or 1))
+
 # Create Celery app
 celery_app = Celery(
     'news_discuss',
@@ -20,8 +24,9 @@ celery_app = Celery(
 celery_app.conf.update(
     # Task settings
     task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    accept_content=['json', 'msgpack'],
+    result_serializer='msgpack',
+    result_compression='zstd',
     timezone='UTC',
     enable_utc=True,
     
@@ -32,6 +37,7 @@ celery_app.conf.update(
     },
     
     # Worker settings
+    worker_concurrency=WORKER_CONCURRENCY,
     worker_prefetch_multiplier=1,
     task_acks_late=True,
     
@@ -44,9 +50,9 @@ celery_app.conf.update(
     
     # Beat schedule for periodic tasks
     beat_schedule={
-        'fetch-news-every-30-seconds': {
-            'task': 'src.tasks.news_tasks.fetch_and_process_news',
-            'schedule': 300.0,  # Every 5 minutes
+        'check-news-sources-every-minute': {
+            'task': 'src.tasks.news_tasks.check_news_sources',
+            'schedule': 60.0,  # Every minute, queues processing only on changes
             'options': {'queue': 'news_processing'}
         },
         'cleanup-old-articles-daily': {
@@ -62,5 +68,26 @@ celery_app.conf.update(
     },
 )
 
+
+@import_modules.connect
+def _configure_embedding_threads(**kwargs):
+    # Sent before the task modules, and so the embedding model, are imported.
+    # Every prefork child runs the model, so they share the cores instead of each using all of them
+    os.environ.setdefault('EMBED_THREADS', str(max(1, (os.cpu_count() or 1) // WORKER_CONCURRENCY)))
+
+
+@worker_process_init.connect
+def _configure_worker_process(**kwargs):
+    # torch's intra-op pool is per process, size it again in each prefork child.
+    # ONNX Runtime sessions are sized when created and don't use torch's pool
+    from src.services.embeddings import embedding_service, set_embedding_threads
+    if embedding_service.backend == "torch":
+        set_embedding_threads()
+
+    # A fresh event loop for this child, tasks reuse it instead of asyncio.run
+    from src.tasks import reset_event_loop
+    reset_event_loop()
+
+
 # Auto-discover tasks
 celery_app.autodiscover_tasks()
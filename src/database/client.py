@@ -1,14 +1,32 @@
 import chromadb
+import numpy as np
 from chromadb.config import Settings
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Tuple
 import uuid
 import json
+import logging
 import os
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Only articles published within this window are considered "recent"
+RECENT_NEWS_WINDOW_SECONDS = 30 * 86400
+# The English original is kept in metadata, capped so list queries stay small
+ARTICLE_CONTENT_METADATA_CHARS = 1000
+
+
+def as_vector(embedding) -> np.ndarray:
+    """
+    Embedding as a contiguous float32 array, the precision Chroma's index stores,
+    so vectors cross the client boundary without a per-float list conversion
+    """
+    return np.ascontiguousarray(embedding, dtype=np.float32)
+
 
 class ChromaDBClient:
     def __init__(self, persist_directory: str = "./chroma_db"):
@@ -32,6 +50,11 @@ class ChromaDBClient:
             metadata={"description": "Chat conversations with metadata"}
         )
 
+        self.response_cache_collection = self.client.get_or_create_collection(
+            name="response_cache",
+            metadata={"description": "Semantic cache of chat responses", "hnsw:space": "cosine"}
+        )
+
     async def connect(self):
         """Connect to database - no-op for ChromaDB but kept for compatibility"""
         pass
@@ -40,6 +63,10 @@ class ChromaDBClient:
         """Disconnect from database - no-op for ChromaDB but kept for compatibility"""
         pass
 
+    async def ping(self):
+        """Check that the underlying ChromaDB client is usable"""
+        self.client.heartbeat()
+
     async def __aenter__(self):
         await self.connect()
         return self
@@ -56,29 +83,26 @@ class ChromaDBClient:
         published_at: datetime,
         title_fr: Optional[str] = None,
         content_fr: Optional[str] = None,
-        embedding: Optional[List[float]] = None
+        embedding: Optional[np.ndarray] = None
     ) -> Dict[str, Any]:
         """
         Create a news article in ChromaDB
         """
-        article_id = str(uuid.uuid4())
+        article_id = uuid.uuid4().hex
         
-        # Prepare document content (French version for better search in French)
-        document_text = title_fr or title
-        if content_fr:
-            document_text += " " + content_fr
-        elif content:
-            document_text += " " + content
+        # The full article text is the document (French version when available),
+        # metadata only keeps the small fields that are filtered on or listed
+        document_text = content_fr or content
 
         # Prepare metadata
         metadata = {
             "title": title,
             "title_fr": title_fr or "",
-            "content": content[:1000],  # Truncate for metadata storage
-            "content_fr": (content_fr or "")[:1000],
+            "content": content[:ARTICLE_CONTENT_METADATA_CHARS],  # English original, capped
             "url": url,
             "published_at": published_at.isoformat(),
-            "created_at": datetime.now().isoformat()
+            "published_ts": int(published_at.timestamp()),  # Numeric copy for range filters
+            "created_ts": int(time.time())
         }
 
         # Add to collection
@@ -86,7 +110,7 @@ class ChromaDBClient:
             documents=[document_text],
             metadatas=[metadata],
             ids=[article_id],
-            embeddings=[embedding] if embedding else None
+            embeddings=[as_vector(embedding)] if embedding is not None else None
         )
 
         return {
@@ -107,7 +131,7 @@ class ChromaDBClient:
         try:
             results = self.news_collection.get(
                 where={"url": url},
-                include=["documents", "metadatas", "embeddings"]
+                include=["documents", "metadatas"]
             )
             
             if not results["ids"]:
@@ -121,77 +145,164 @@ class ChromaDBClient:
                 "id": results["ids"][idx],
                 "title": metadata["title"],
                 "titleFr": metadata["title_fr"],
-                "content": metadata["content"],
-                "contentFr": metadata["content_fr"],
+                "content": metadata.get("content", ""),
+                "contentFr": results["documents"][idx],
                 "url": metadata["url"],
-                "publishedAt": datetime.fromisoformat(metadata["published_at"]),
-                "embedding": results["embeddings"][idx] if results["embeddings"] else None
+                "publishedAt": datetime.fromisoformat(metadata["published_at"])
             }
         except Exception:
             return None
 
-    async def get_recent_news_articles(self, limit: int = 20) -> List[Dict[str, Any]]:
+    async def filter_existing_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Return the subset of URLs that already have a stored article, with a single lookup
+        """
+        if not urls:
+            return set()
+
+        results = self.news_collection.get(
+            where={"url": {"$in": list(urls)}},
+            include=["metadatas"]
+        )
+        return {metadata["url"] for metadata in results["metadatas"]}
+
+    async def get_news_article_by_id(self, article_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get recent news articles (ChromaDB doesn't have built-in ordering, so we'll get all and sort)
+        Find a news article by ID
         """
         try:
             results = self.news_collection.get(
-                include=["documents", "metadatas", "embeddings"],
-                limit=limit * 2  # Get more to sort
+                ids=[article_id],
+                include=["documents", "metadatas"]
             )
-
             
             if not results["ids"]:
-                return []
+                return None
+                
+            metadata = results["metadatas"][0]
+            
+            return {
+                "id": results["ids"][0],
+                "title": metadata["title"],
+                "titleFr": metadata["title_fr"],
+                "content": metadata.get("content", ""),
+                "contentFr": results["documents"][0],
+                "url": metadata["url"],
+                "publishedAt": datetime.fromisoformat(metadata["published_at"])
+            }
+        except Exception:
+            return None
 
-            articles = []
-            for i, article_id in enumerate(results["ids"]):
-                metadata = results["metadatas"][i]
-                articles.append({
-                    "id": article_id,
-                    "title": metadata["title"],
-                    "titleFr": metadata["title_fr"],
-                    "content": metadata["content"],
-                    "contentFr": metadata["content_fr"],
-                    "url": metadata["url"],
-                    "publishedAt": datetime.fromisoformat(metadata["published_at"]),
-                    "embedding": results["embeddings"][i]
-                })
+    async def get_recent_news_articles_columnar(
+        self,
+        limit: int = 20,
+        include_content: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Get recent news articles as columns (most recent first).
+        ChromaDB has no ordering, so the recent window is filtered on the numeric
+        published_ts index and sorted with numpy; article text is only fetched for the
+        returned rows when include_content is set.
+        """
+        try:
+            cutoff = int(time.time()) - RECENT_NEWS_WINDOW_SECONDS
+            results = self.news_collection.get(
+                where={"published_ts": {"$gte": cutoff}},
+                include=["metadatas"]
+            )
 
-            # Sort by published date (most recent first)
+            metadatas = results["metadatas"]
+            ts = np.fromiter((m["published_ts"] for m in metadatas), dtype=np.int64, count=len(metadatas))
+            order = np.argsort(ts, kind="stable")[::-1][:limit]
+
+            ids = [results["ids"][i] for i in order]
+            top = [metadatas[i] for i in order]
+            columns = {
+                "ids": ids,
+                "titles": [m["title"] for m in top],
+                "titles_fr": [m["title_fr"] for m in top],
+                "urls": [m["url"] for m in top],
+                "contents": [m.get("content", "") for m in top],
+                "published_at": [m["published_at"] for m in top],
+                "ts": ts[order]
+            }
 
-            articles.sort(key=lambda x: x["publishedAt"], reverse=True)
+            if include_content:
+                documents = {}
+                if ids:
+                    content_results = self.news_collection.get(ids=ids, include=["documents"])
+                    documents = dict(zip(content_results["ids"], content_results["documents"]))
+                columns["documents"] = [documents.get(article_id, "") for article_id in ids]
 
-            return articles[:limit]
-        except Exception as e :
-            print(f"Error in get_recent_news_articles: {e}")
-            raise e
-            
+            return columns
+        except Exception:
+            logger.error("Error in get_recent_news_articles_columnar", exc_info=True)
+            raise
+
+    async def get_recent_news_articles(
+        self,
+        limit: int = 20,
+        include_content: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get recent news articles, one dict per article (adapter over the columnar query)
+        content is the capped English original from metadata, the full French
+        document is only fetched into contentFr when include_content is set
+        """
+        columns = await self.get_recent_news_articles_columnar(limit, include_content=include_content)
+        documents = columns.get("documents") or [None] * len(columns["ids"])
+
+        return [
+            {
+                "id": article_id,
+                "title": title,
+                "titleFr": title_fr,
+                "content": content,
+                "contentFr": document,
+                "url": url,
+                "publishedAt": datetime.fromisoformat(published_at)
+            }
+            for article_id, title, title_fr, content, url, published_at, document in zip(
+                columns["ids"],
+                columns["titles"],
+                columns["titles_fr"],
+                columns["contents"],
+                columns["urls"],
+                columns["published_at"],
+                documents
+            )
+        ]
 
     async def search_articles_by_similarity(
         self, 
         query_text: str = None,
-        query_embedding: List[float] = None, 
+        query_embedding: Optional[np.ndarray] = None, 
         limit: int = 5,
-        similarity_threshold: float = 0.7
-    ) -> List[Dict[str, Any]]:
+        similarity_threshold: float = 0.7,
+        return_embeddings: bool = False
+    ) -> Dict[str, Any]:
         """
-        Search articles by semantic similarity using ChromaDB's built-in vector search
+        Search articles by semantic similarity using ChromaDB's built-in vector search.
+        Returns the nested ChromaDB query result (like the sync version), trimmed to the threshold
         """
+        include = ["metadatas", "distances"]
+        if return_embeddings:
+            include.append("embeddings")
+
         try:
-            if query_embedding:
+            if query_embedding is not None:
                 # Use provided embedding
                 results = self.news_collection.query(
-                    query_embeddings=[query_embedding],
+                    query_embeddings=[as_vector(query_embedding)],
                     n_results=limit,
-                    include=["documents", "metadatas", "distances", "embeddings"]
+                    include=include
                 )
             elif query_text:
                 # Let ChromaDB handle embedding
                 results = self.news_collection.query(
                     query_texts=[query_text],
                     n_results=limit,
-                    include=["documents", "metadatas", "distances", "embeddings"]
+                    include=include
                 )
             else:
                 return []
@@ -199,55 +310,47 @@ class ChromaDBClient:
             if not results["ids"]:
                 return []
 
-            articles = []
-            for i, article_id in enumerate(results["ids"][0]):  # Query returns nested lists
-                metadata = results["metadatas"][0][i]
-                distance = results["distances"][0][i]
-                similarity = 1 - distance  # Convert distance to similarity
-                
-                if similarity >= similarity_threshold:
-                    articles.append({
-                        "id": article_id,
-                        "title": metadata["title"],
-                        "titleFr": metadata["title_fr"],
-                        "content": metadata["content"],
-                        "contentFr": metadata["content_fr"],
-                        "url": metadata["url"],
-                        "publishedAt": datetime.fromisoformat(metadata["published_at"]),
-                        "similarity": similarity,
-                        "embedding": results["embeddings"][0][i] if results["embeddings"] else None
-                    })
-
-            return articles
-        except Exception as e:
-            print(f"Error in similarity search: {e}")
+            # Hits come back sorted by distance, so the passing ones are a prefix
+            distances = np.asarray(results["distances"][0], dtype=np.float32)
+            keep = int(np.count_nonzero((1 - distances) >= similarity_threshold))
+
+            trimmed = {"ids": [results["ids"][0][:keep]]}
+            for key in include:
+                trimmed[key] = [results[key][0][:keep]]
+            return trimmed
+        except Exception:
+            logger.error("Error in similarity search", exc_info=True)
             return []
 
     def search_articles_by_similarity_sync(
         self, 
         query_text: str = None,
-        query_embedding: List[float] = None, 
+        query_embedding: Optional[np.ndarray] = None, 
         limit: int = 5,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        return_embeddings: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Synchronous version of search articles by semantic similarity using ChromaDB's built-in vector search
         """
-        try:
+        include = ["documents", "metadatas", "distances"]
+        if return_embeddings:
+            include.append("embeddings")
 
-            if query_embedding:
+        try:
+            if query_embedding is not None:
                 # Use provided embedding
                 results = self.news_collection.query(
-                    query_embeddings=[query_embedding],
+                    query_embeddings=[as_vector(query_embedding)],
                     n_results=limit,
-                    include=["documents", "metadatas", "distances", "embeddings"]
+                    include=include
                 )
             elif query_text:
                 # Let ChromaDB handle embedding
                 results = self.news_collection.query(
                     query_texts=[query_text],
                     n_results=limit,
-                    include=["documents", "metadatas", "distances", "embeddings"]
+                    include=include
                 )
             else:
                 return []
@@ -257,8 +360,8 @@ class ChromaDBClient:
 
 
             return results
-        except Exception as e:
-            print(f"Error in sync similarity search: {e}")
+        except Exception:
+            logger.error("Error in sync similarity search", exc_info=True)
             return []
 
     # Conversation Methods (simplified - storing as documents)
@@ -266,12 +369,14 @@ class ChromaDBClient:
         """
         Create a new conversation
         """
-        conversation_id = str(uuid.uuid4())
+        conversation_id = uuid.uuid4().hex
+        now = int(time.time())
         
         metadata = {
+            "type": "conversation",
             "user_id": user_id or "",
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_ts": now,
+            "updated_ts": now
         }
 
         # Store conversation metadata
@@ -296,12 +401,13 @@ class ChromaDBClient:
         """
         Add a message to a conversation (stored as separate document)
         """
-        message_id = str(uuid.uuid4())
+        message_id = uuid.uuid4().hex
         
         metadata = {
+            "type": "message",
             "conversation_id": conversation_id,
             "role": role.upper(),
-            "created_at": datetime.now().isoformat()
+            "created_ms": time.time_ns() // 1_000_000  # Milliseconds, used for ordering
         }
 
         # Store message
@@ -316,52 +422,94 @@ class ChromaDBClient:
             "conversationId": conversation_id,
             "role": role.upper(),
             "content": content,
-            "createdAt": datetime.now()
+            "createdAt": datetime.fromtimestamp(metadata["created_ms"] / 1000)
         }
 
+    async def add_messages_to_conversation(
+        self,
+        conversation_id: str,
+        messages: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Add several (role, content) messages to a conversation with a single collection write
+        """
+        ids = []
+        documents = []
+        metadatas = []
+        created_ms = time.time_ns() // 1_000_000
+        created_at = datetime.fromtimestamp(created_ms / 1000)
+        for offset, (role, content) in enumerate(messages):
+            ids.append(uuid.uuid4().hex)
+            documents.append(content)
+            metadatas.append({
+                "type": "message",
+                "conversation_id": conversation_id,
+                "role": role.upper(),
+                "created_ms": created_ms + offset  # Keeps batch order when sorting
+            })
+
+        # Store messages
+        self.conversations_collection.add(
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids
+        )
+
+        return [
+            {
+                "id": message_id,
+                "conversationId": conversation_id,
+                "role": metadata["role"],
+                "content": content,
+                "createdAt": created_at
+            }
+            for message_id, content, metadata in zip(ids, documents, metadatas)
+        ]
+
     async def get_conversation_with_messages(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """
         Get conversation with all its messages
         """
         try:
-            # First, check if the conversation exists by trying to get conversation metadata
-            try:
+            # Messages carry type="message", so one filtered get returns only them
+            results = self.conversations_collection.get(
+                where={"$and": [
+                    {"conversation_id": conversation_id},
+                    {"type": "message"}
+                ]},
+                include=["documents", "metadatas"]
+            )
+
+            if not results["ids"]:
+                # No messages yet, fall back to checking the conversation itself exists
                 conversation_results = self.conversations_collection.get(
                     ids=[conversation_id],
-                    include=["metadatas"]
+                    include=[]
                 )
                 if not conversation_results["ids"]:
                     return None
-            except:
-                return None
 
-            # Get all messages for this conversation
-            results = self.conversations_collection.get(
-                where={"conversation_id": conversation_id},
-                include=["documents", "metadatas"]
-            )
-            
+            # Sort messages by creation time (int milliseconds), messages written before
+            # the field was renamed hold the same value under created_ts
+            created_ms = [m.get("created_ms", m.get("created_ts", 0)) for m in results["metadatas"]]
+            order = sorted(range(len(results["ids"])), key=created_ms.__getitem__)
+
             messages = []
-            if results["ids"]:
-                for i, message_id in enumerate(results["ids"]):
-                    metadata = results["metadatas"][i]
-                    if "role" in metadata:  # This is a message, not conversation metadata
-                        messages.append({
-                            "id": message_id,
-                            "role": metadata["role"],
-                            "content": results["documents"][i],
-                            "createdAt": datetime.fromisoformat(metadata["created_at"])
-                        })
-
-            # Sort messages by creation time
-            messages.sort(key=lambda x: x["createdAt"])
+            for i in order:
+                metadata = results["metadatas"][i]
+                messages.append({
+                    "id": results["ids"][i],
+                    "role": metadata["role"],
+                    "content": results["documents"][i],
+                    "createdAt": datetime.fromtimestamp(created_ms[i] / 1000)
+                })
 
             return {
                 "id": conversation_id,
                 "messages": messages
             }
-        except Exception as e:
-            print(f"Error getting conversation: {e}")
+        except Exception:
+            logger.error("Error getting conversation", exc_info=True)
             return None
 
     # Legacy methods for compatibility
@@ -378,7 +526,7 @@ class ChromaDBClient:
     async def update_article_embedding(
         self,
         article_id: str,
-        embedding: List[float]
+        embedding: np.ndarray
     ):
         """Update embedding - would need to re-add to ChromaDB"""
         # ChromaDB doesn't support updates, would need to delete and re-add
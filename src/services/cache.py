@@ -0,0 +1,156 @@
+from langgraph.cache.redis import RedisCache
+from typing import Dict, Optional, Any
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+import numpy as np
+import redis
+import redis.asyncio
+from dotenv import load_dotenv
+
+from src.database.client import as_vector
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Same Redis instance Celery uses as broker/backend
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Clients connect lazily on first command
+redis_client = redis.Redis.from_url(REDIS_URL)
+async_redis_client = redis.asyncio.Redis.from_url(REDIS_URL)
+
+# News list responses are invalidated on ingest, the TTL only bounds staleness
+NEWS_CACHE_TTL = 60
+# Stored articles never change, their entries only expire to bound memory
+ARTICLE_CACHE_TTL = 3600
+# Query embeddings are deterministic for a given model, the TTL only bounds memory
+QUERY_EMBEDDING_TTL = 86400
+
+
+class SemanticResponseCache:
+    def __init__(
+        self,
+        collection,
+        similarity_threshold: float = 0.93,
+        ttl: int = 3600,
+        evict_every: int = 100
+    ):
+        """
+        Semantic cache for chat responses stored in a ChromaDB collection.
+        Prompt embeddings are the vectors and the response payload lives in metadata,
+        a hit is any unexpired prompt in the same response language with cosine similarity >= threshold.
+        """
+        self.collection = collection
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+
+    async def lookup(self, embedding: np.ndarray, language: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for the closest stored prompt in that language, if similar enough"""
+        try:
+            # Chroma calls block, keep them off the event loop of the chat request
+            results = await asyncio.to_thread(
+                self.collection.query,
+                query_embeddings=[as_vector(embedding)],
+                n_results=1,
+                where={"$and": [
+                    {"expires_at": {"$gt": int(time.time())}},
+                    {"language": language}
+                ]},
+                include=["metadatas", "distances"]
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if not results["ids"][0] or 1 - results["distances"][0][0] < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(results["metadatas"][0][0]["payload"])
+
+    async def store(self, prompt: str, embedding: np.ndarray, payload: Dict[str, Any], language: str):
+        """Store a response payload for the prompt, expired entries are evicted periodically"""
+        now = int(time.time())
+        try:
+            await asyncio.to_thread(
+                self.collection.add,
+                ids=[str(uuid.uuid4())],
+                embeddings=[as_vector(embedding)],
+                documents=[prompt],
+                metadatas=[{
+                    "payload": json.dumps(payload),
+                    "language": language,
+                    "expires_at": now + self.ttl
+                }]
+            )
+
+            self._stores += 1
+            if self._stores % self.evict_every == 0:
+                await asyncio.to_thread(self.collection.delete, where={"expires_at": {"$lte": now}})
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "similarity_threshold": self.similarity_threshold
+        }
+
+
+class CountingRedisCache(RedisCache):
+    """LangGraph node cache in Redis that keeps hit/miss counters"""
+
+    def __init__(self, client: redis.Redis = redis_client, prefix: str = "langgraph:cache:"):
+        super().__init__(client, prefix=prefix)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, keys):
+        values = super().get(keys)
+        self.hits += len(values)
+        self.misses += len(keys) - len(values)
+        return values
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+async def get_cached(key: str) -> Optional[bytes]:
+    """Get a pre-serialized value, treating Redis errors as a miss"""
+    try:
+        return await async_redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+
+async def set_cached(key: str, value: bytes, ttl: int):
+    """Store a pre-serialized value with a TTL"""
+    try:
+        await async_redis_client.setex(key, ttl, value)
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+def invalidate_recent_news_cache():
+    """Drop every cached news:recent:* list after new articles are stored"""
+    try:
+        keys = list(redis_client.scan_iter(match="news:recent:*", count=100))
+        if keys:
+            redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"News cache invalidation failed: {e}")
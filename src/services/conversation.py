@@ -1,13 +1,26 @@
-from typing import Dict, List, Any, Optional, TypedDict
+from typing import AsyncIterator, Dict, List, Any, Optional, TypedDict
 from langgraph.graph import StateGraph, END
+from langgraph.types import CachePolicy
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 import logging
 import asyncio
+import hashlib
+import re
+from collections import OrderedDict
+import numpy as np
 
 from src.services.news_processor import news_processor
+from src.services.embeddings import embedding_service
+from src.services.cache import (
+    CountingRedisCache,
+    SemanticResponseCache,
+    get_cached,
+    set_cached,
+    QUERY_EMBEDDING_TTL
+)
 from src.database.client import db_client
 
 logger = logging.getLogger(__name__)
@@ -20,6 +33,74 @@ class QueryAnalysis(BaseModel):
     intent: str = Field(description="User intent classification", pattern="^(news_discussion|general_chat)$")
 
 
+# Rule-based analysis for unambiguous queries, anything else goes to the LLM
+ENGLISH_REQUEST_RE = re.compile(r"\b(in english|en anglais|english please)\b", re.IGNORECASE)
+NEWS_KEYWORDS_RE = re.compile(
+    r"\b(news|actualit[ée]s?|infos?|information|nouvelles?|article|journal|politique|gouvernement|"
+    r"président|ministre|élections?|économie|guerre|france|europe|monde|sport|climat)\b",
+    re.IGNORECASE
+)
+SMALL_TALK_RE = re.compile(
+    r"^\s*(bonjour|bonsoir|salut|coucou|hello|hi|hey|merci( beaucoup)?|thanks|thank you|au revoir|bye|ça va)"
+    r"[\s!.?,]*$",
+    re.IGNORECASE
+)
+
+
+def _detect_language(user_message: str) -> str:
+    """Response language requested by the message, French unless English is asked for"""
+    return "english" if ENGLISH_REQUEST_RE.search(user_message) else "french"
+
+
+def _fast_analyze(user_message: str) -> Optional[Dict]:
+    """Return a QueryAnalysis-shaped dict for clear-cut queries, None when the LLM should decide"""
+    language = _detect_language(user_message)
+
+    if SMALL_TALK_RE.match(user_message):
+        intent = "general_chat"
+    elif NEWS_KEYWORDS_RE.search(user_message):
+        intent = "news_discussion"
+    else:
+        return None
+
+    return {
+        "keywords": user_message,
+        "language": language,
+        "intent": intent
+    }
+
+
+# Static system prompts, sent as-is with every generation call
+FR_SYSTEM = SystemMessage(content="""Tu es un assistant conversationnel spécialisé dans l'actualité française, conçu pour aider les apprenants de français niveau B1.
+
+RÈGLES STRICTES À SUIVRE:
+- OBLIGATOIRE: Base-toi UNIQUEMENT sur les articles fournis comme sources. N'invente JAMAIS d'informations.
+- OBLIGATOIRE: Cite toujours tes sources en mentionnant "[Source X]" quand tu utilises des informations d'un article.
+- Si aucun article pertinent n'est fourni, dis clairement que tu n'as pas d'informations récentes sur ce sujet.
+- N'affirme rien que tu ne peux pas appuyer avec les sources fournies.
+
+Caractéristiques de ton style:
+- Utilise un vocabulaire simple et accessible (niveau B1)
+- Phrases claires et directes
+- Évite les structures grammaticales complexes
+- Sois pédagogique et engageant
+- Aide les utilisateurs à comprendre l'actualité en français simple
+- Encourage la discussion et pose des questions pour maintenir l'engagement
+- Maintiens la cohérence avec les messages précédents de la conversation
+
+IMPORTANT: Termine toujours ta réponse en listant les sources utilisées avec leurs titres et URLs.""")
+EN_SYSTEM = SystemMessage(content="""You are a helpful assistant discussing French news. 
+
+STRICT RULES:
+- MANDATORY: Base your responses ONLY on the provided news articles. NEVER make up information.
+- MANDATORY: Always cite your sources by mentioning "[Source X]" when using information from an article.
+- If no relevant articles are provided, clearly state that you don't have recent information on that topic.
+- Never claim anything you cannot support with the provided sources.
+
+Respond in English but mention French terms when relevant. Maintain consistency with previous conversation.
+IMPORTANT: Always end your response by listing the sources used with their titles and URLs.""")
+
+
 class ConversationState(TypedDict):
     """State schema for LangGraph"""
     messages: List[Dict]
@@ -30,6 +111,82 @@ class ConversationState(TypedDict):
     conversation_id: Optional[str]
 
 
+class BatchingEmbedder:
+    def __init__(self, max_wait_ms: float = 8, max_batch_size: int = 32, cache_size: int = 1024):
+        """
+        Coalesce concurrent query embeddings into a single batched encode call.
+        Requests arriving within max_wait_ms of the first one share a batch.
+        Repeated queries are answered from an in-process LRU, then from Redis
+        so that other workers' encodes are reused too.
+        """
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_size = cache_size
+
+    async def embed(self, text: str) -> np.ndarray:
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        redis_key = f"embedding:query:{embedding_service.model_id}:{key.hex()}"
+        raw = await get_cached(redis_key)
+        if raw is not None:
+            embedding = np.frombuffer(raw, dtype=np.float32)
+        else:
+            embedding = await self._encode(text)
+            await set_cached(redis_key, embedding.tobytes(), QUERY_EMBEDDING_TTL)
+
+        self._cache[key] = embedding
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return embedding
+
+    async def _encode(self, text: str) -> np.ndarray:
+        # The flush loop is started lazily so it runs on the serving event loop
+        if self._flush_task is None or self._flush_task.done():
+            self._queue = asyncio.Queue()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                embeddings = await asyncio.to_thread(
+                    embedding_service.create_embeddings_batch,
+                    [text for text, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+
 class FrenchNewsConversationAgent:
     def __init__(self, openai_api_key: str):
         self.llm = ChatOpenAI(
@@ -37,69 +194,106 @@ class FrenchNewsConversationAgent:
             model="gpt-4",
             temperature=0.7
         )
+        # Shared node cache for the deterministic graph steps
+        self.node_cache = CountingRedisCache()
+        self.embedder = BatchingEmbedder()
+        # Near-duplicate opening questions skip the whole graph
+        self.response_cache = SemanticResponseCache(db_client.response_cache_collection)
+        # Prompts and the structured-output runnable are immutable, build them once
+        self._structured_llm = self.llm.with_structured_output(QueryAnalysis)
+        self._analysis_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are analyzing a user query about French news. Determine:
+            1. Is this about specific news topics or general conversation?
+            2. What keywords should we use to find relevant articles?
+            3. Should we respond in French or English?
+            
+            For keywords: extract the most relevant terms that would help find news articles.
+            For language: choose "french" for French learners (default) or "english" if specifically requested.
+            For intent: choose "news_discussion" for news-related queries or "general_chat" for other conversations."""),
+            ("human", "{query}")
+        ])
+        # In-process LRU of LLM analyses for character-identical messages
+        self._analysis_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+        self._analysis_cache_size = 1024
+        # Background persistence tasks, referenced so they aren't garbage collected
+        self._background_tasks = set()
         self.graph = self._build_graph()
 
+    async def _analyze_cached(self, user_message: str) -> Dict:
+        """Structured LLM analysis of the message, memoized by message digest"""
+        key = hashlib.blake2b(user_message.encode(), digest_size=16).digest()
+        cached = self._analysis_cache.get(key)
+        if cached is not None:
+            self._analysis_cache.move_to_end(key)
+            return cached
+
+        analysis: QueryAnalysis = await self._structured_llm.ainvoke(
+            self._analysis_prompt.format_messages(query=user_message)
+        )
+        result = analysis.model_dump()
+
+        self._analysis_cache[key] = result
+        if len(self._analysis_cache) > self._analysis_cache_size:
+            self._analysis_cache.popitem(last=False)
+        return result
+
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph conversation flow"""
         
-        def analyze_query_node(state: ConversationState) -> ConversationState:
+        async def analyze_query_node(state: ConversationState) -> ConversationState:
             """Analyze user query and determine intent"""
             user_message = state["messages"][-1]["content"]
-            
-            # Use structured output with Pydantic model
-            structured_llm = self.llm.with_structured_output(QueryAnalysis)
-            
-            analysis_prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are analyzing a user query about French news. Determine:
-                1. Is this about specific news topics or general conversation?
-                2. What keywords should we use to find relevant articles?
-                3. Should we respond in French or English?
-                
-                For keywords: extract the most relevant terms that would help find news articles.
-                For language: choose "french" for French learners (default) or "english" if specifically requested.
-                For intent: choose "news_discussion" for news-related queries or "general_chat" for other conversations."""),
-                ("human", "{query}")
-            ])
-            
-            try:
-                analysis: QueryAnalysis = structured_llm.invoke(
-                    analysis_prompt.format_messages(query=user_message)
-                )
-                state["query_analysis"] = analysis.model_dump()
-                state["language"] = analysis.language
-            except Exception as e:
-                logger.warning(f"Structured output failed, using fallback: {e}")
-                # Fallback to default values
-                state["query_analysis"] = {
-                    "keywords": user_message,
-                    "language": "french",
-                    "intent": "news_discussion"
-                }
-                state["language"] = "french"
-            
-            return state
 
-        def retrieve_articles_node(state: ConversationState) -> ConversationState:
+            # Skip the LLM round trip when rules are confident
+            analysis = _fast_analyze(user_message)
+            if analysis is None:
+                try:
+                    analysis = await self._analyze_cached(user_message)
+                except Exception as e:
+                    logger.warning(f"Structured output failed, using fallback: {e}")
+                    # Fallback to default values
+                    analysis = {
+                        "keywords": user_message,
+                        "language": "french",
+                        "intent": "news_discussion"
+                    }
+
+            update = {
+                "query_analysis": analysis,
+                "language": analysis["language"]
+            }
+            if analysis["intent"] == "general_chat":
+                # Articles prefetched for the raw message don't apply to small talk
+                update["relevant_articles"] = []
+            return update
+
+        async def retrieve_articles_node(state: ConversationState) -> ConversationState:
             """Retrieve relevant news articles"""
+            if state.get("relevant_articles"):
+                # Already prefetched by chat() while the conversation was loading
+                return {"relevant_articles": state["relevant_articles"]}
+
             analysis = state.get("query_analysis", {})
             keywords = analysis.get("keywords", state["messages"][-1]["content"])
             
             try:
-                # Use the simple synchronous method
-                relevant_articles = news_processor.get_articles_for_conversation_sync(
+                # Concurrent chats share one batched embedding call
+                query_embedding = await self.embedder.embed(keywords)
+                # The Chroma query is blocking, keep it off the event loop
+                relevant_articles = await asyncio.to_thread(
+                    news_processor.get_articles_for_conversation_sync,
                     query=keywords, 
-                    limit=3
+                    limit=3,
+                    query_embedding=query_embedding
                 )
-                state["relevant_articles"] = relevant_articles
                 logger.info(f"Retrieved {len(relevant_articles)} articles for query: {keywords}")
+                return {"relevant_articles": relevant_articles}
                 
             except Exception as e:
                 logger.error(f"Error retrieving articles: {e}")
-                state["relevant_articles"] = []
-            
-            return state
+                return {"relevant_articles": []}
 
-        def generate_response_node(state: ConversationState) -> ConversationState:
+        async def generate_response_node(state: ConversationState) -> ConversationState:
             """Generate conversational response"""
             messages = state.get("messages", [])
             user_message = messages[-1]["content"] if messages else ""
@@ -112,15 +306,16 @@ class FrenchNewsConversationAgent:
             if articles:
                 context = "Actualités pertinentes (IMPORTANT: Ces articles sont vos seules sources d'information):\n\n"
                 
-                # ChromaDB returns a dict with metadatas field containing list of lists
+                # ChromaDB returns a dict with metadatas/documents fields containing list of lists
                 metadatas = articles.get('metadatas', [[]])
+                documents = articles.get('documents', [[]])
                 if metadatas and len(metadatas) > 0:
                     article_list = metadatas[0] 
                     
                     for i, article_metadata in enumerate(article_list, 1):
-                        # Extract title and content from metadata
+                        # Title comes from metadata, the article text is the document
                         title_fr = article_metadata.get('title_fr', article_metadata.get('title', ''))
-                        content_fr = article_metadata.get('content_fr', '')
+                        content_fr = documents[0][i - 1] if documents and documents[0] else ''
                         url = article_metadata.get('url', '')
                         published_at = article_metadata.get('published_at', '')
                         
@@ -139,71 +334,41 @@ class FrenchNewsConversationAgent:
                             'published_at': published_at
                         })
             
-            # Store sources in state for API response
-            state["sources_used"] = sources_info
-
-            # Build conversation history for context
-            conversation_history = []
-            if len(messages) > 1:  # More than just the current message
-                for msg in messages[:-1]:  # Exclude the current message
-                    role = "Human" if msg["role"].lower() == "user" else "Assistant"
-                    conversation_history.append(f"{role}: {msg['content']}")
-            system_message = """Tu es un assistant conversationnel spécialisé dans l'actualité française, conçu pour aider les apprenants de français niveau B1.
-
-RÈGLES STRICTES À SUIVRE:
-- OBLIGATOIRE: Base-toi UNIQUEMENT sur les articles fournis comme sources. N'invente JAMAIS d'informations.
-- OBLIGATOIRE: Cite toujours tes sources en mentionnant "[Source X]" quand tu utilises des informations d'un article.
-- Si aucun article pertinent n'est fourni, dis clairement que tu n'as pas d'informations récentes sur ce sujet.
-- N'affirme rien que tu ne peux pas appuyer avec les sources fournies.
-
-Caractéristiques de ton style:
-- Utilise un vocabulaire simple et accessible (niveau B1)
-- Phrases claires et directes
-- Évite les structures grammaticales complexes
-- Sois pédagogique et engageant
-- Aide les utilisateurs à comprendre l'actualité en français simple
-- Encourage la discussion et pose des questions pour maintenir l'engagement
-- Maintiens la cohérence avec les messages précédents de la conversation
 
-IMPORTANT: Termine toujours ta réponse en listant les sources utilisées avec leurs titres et URLs."""
+            # Build conversation history for context, excluding the current message
+            conversation_history = "\n".join(
+                f"{'Human' if msg['role'].lower() == 'user' else 'Assistant'}: {msg['content']}"
+                for msg in messages[:-1]
+            ) if len(messages) > 1 else ""
 
             if language == "french":
                 conversation_context = ""
                 if conversation_history:
-                    conversation_context = f"Historique de la conversation:\n{chr(10).join(conversation_history)}\n\n"
+                    conversation_context = f"Historique de la conversation:\n{conversation_history}\n\n"
                 
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", system_message),
-                    ("human", f"""{conversation_context}Contexte d'actualités:\n{context}\n\nQuestion actuelle de l'utilisateur: {user_message}
+                human_body = f"""{conversation_context}Contexte d'actualités:\n{context}\n\nQuestion actuelle de l'utilisateur: {user_message}
                     
-                    Réponds en français B1 de manière conversationnelle et engageante, en tenant compte de l'historique de la conversation.""")
-                ])
+                    Réponds en français B1 de manière conversationnelle et engageante, en tenant compte de l'historique de la conversation."""
+                system_message = FR_SYSTEM
             else:
                 conversation_context = ""
                 if conversation_history:
-                    conversation_context = f"Conversation history:\n{chr(10).join(conversation_history)}\n\n"
+                    conversation_context = f"Conversation history:\n{conversation_history}\n\n"
                 
-                prompt = ChatPromptTemplate.from_messages([
-                    ("system", """You are a helpful assistant discussing French news. 
-
-STRICT RULES:
-- MANDATORY: Base your responses ONLY on the provided news articles. NEVER make up information.
-- MANDATORY: Always cite your sources by mentioning "[Source X]" when using information from an article.
-- If no relevant articles are provided, clearly state that you don't have recent information on that topic.
-- Never claim anything you cannot support with the provided sources.
-
-Respond in English but mention French terms when relevant. Maintain consistency with previous conversation.
-IMPORTANT: Always end your response by listing the sources used with their titles and URLs."""),
-                    ("human", f"""{conversation_context}News context:\n{context}\n\nCurrent user question: {user_message}""")
-                ])
-            
-            response = self.llm.invoke(prompt.format_messages())
-            state["messages"].append({
-                "role": "assistant",
-                "content": response.content
-            })
+                human_body = f"{conversation_context}News context:\n{context}\n\nCurrent user question: {user_message}"
+                system_message = EN_SYSTEM
             
-            return state
+            # Tokens reach chat_stream() through the graph's "messages" stream mode
+            response = await self.llm.ainvoke([system_message, HumanMessage(content=human_body)])
+
+            # Store sources in state for API response
+            return {
+                "messages": messages + [{
+                    "role": "assistant",
+                    "content": response.content
+                }],
+                "sources_used": sources_info
+            }
 
         def should_retrieve_articles(state: ConversationState) -> str:
             """Decide whether to retrieve articles based on query analysis"""
@@ -228,7 +393,19 @@ IMPORTANT: Always end your response by listing the sources used with their title
         # Build the graph
         workflow = StateGraph(ConversationState)
         
-        workflow.add_node("analyze_query", analyze_query_node)
+        # Cache keys must tolerate partial state, get_graph() prepares tasks with empty input
+        def latest_message_key(state: ConversationState) -> str:
+            messages = state.get("messages") or [{}]
+            return messages[-1].get("content", "")
+
+        # Analysis only depends on the latest message, so identical inputs are served
+        # from the node cache. Retrieval stays uncached: it normally just passes on the
+        # articles chat_stream prefetched for this message, and generation is per turn.
+        workflow.add_node(
+            "analyze_query",
+            analyze_query_node,
+            cache_policy=CachePolicy(ttl=3600, key_func=latest_message_key)
+        )
         workflow.add_node("retrieve_articles", retrieve_articles_node)
         workflow.add_node("generate_response", generate_response_node)
         
@@ -247,81 +424,159 @@ IMPORTANT: Always end your response by listing the sources used with their title
         workflow.add_edge("retrieve_articles", "generate_response")
         workflow.add_edge("generate_response", END)
         
-        return workflow.compile()
+        return workflow.compile(cache=self.node_cache)
 
-    async def chat(self, message: str, conversation_id: Optional[str] = None) -> Dict:
-        """Process a chat message and return response"""
+    async def _prefetch_articles(self, message: str, query_embedding: Optional[np.ndarray] = None):
+        """Retrieve articles for the raw message, off the event loop"""
+        try:
+            if query_embedding is None:
+                query_embedding = await self.embedder.embed(message)
+            return await asyncio.to_thread(
+                news_processor.get_articles_for_conversation_sync,
+                query=message,
+                limit=3,
+                query_embedding=query_embedding
+            )
+        except Exception as e:
+            logger.error(f"Error prefetching articles: {e}")
+            return []
+
+    def _run_in_background(self, coro):
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _persist_turn(
+        self,
+        conversation_id: str,
+        message: str,
+        response: Dict,
+        cache_embedding: Optional[np.ndarray] = None,
+        cache_language: str = "french"
+    ):
+        """Save the turn's messages in one write and, for new conversations, cache the response"""
         try:
+            await db_client.add_messages_to_conversation(
+                conversation_id,
+                [("USER", message), ("ASSISTANT", response["response"])]
+            )
+            if cache_embedding is not None:
+                await self.response_cache.store(message, cache_embedding, response, cache_language)
+        except Exception as e:
+            logger.error(f"Error persisting chat turn: {e}")
+
+    async def chat_stream(self, message: str, conversation_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Process a chat message, yielding {"type": "token"} events as the response is generated
+        and a final {"type": "done"} event with the full response, articles and sources
+        """
+        try:
+            # Only new conversations are cached, follow-up turns depend on history
+            cache_embedding = None
+            # Near-identical prompts can still ask for different response languages.
+            # Lookup and store both key on the message itself so a stored turn can be hit again
+            cache_language = _detect_language(message)
+            if not conversation_id:
+                cache_embedding = await self.embedder.embed(message)
+                cached = await self.response_cache.lookup(cache_embedding, cache_language)
+                if cached:
+                    # Start a fresh conversation so the cached turn isn't shared between users
+                    conversation = await db_client.create_conversation()
+                    self._run_in_background(self._persist_turn(conversation["id"], message, cached))
+                    yield {"type": "token", "content": cached["response"]}
+                    yield {"type": "done", **cached, "conversation_id": conversation["id"]}
+                    return
 
-            # Initialize or load conversation
+            # Initialize or load conversation, or create a new one
             if conversation_id:
-                async with db_client:
-                    conversation = await db_client.get_conversation_with_messages(conversation_id)
-                    if not conversation:
-                        raise ValueError(f"Conversation {conversation_id} not found")
-                    
-                    messages = [
-                        {"role": msg["role"].lower(), "content": msg["content"]}
-                        for msg in conversation["messages"]
-                    ]
+                load_conversation = db_client.get_conversation_with_messages(conversation_id)
             else:
-                # Create new conversation
-                async with db_client:
-                    conversation = await db_client.create_conversation()
-                    conversation_id = conversation["id"]
-                    messages = []
+                load_conversation = db_client.create_conversation()
+
+            # Retrieval only needs the message, run it while the history loads
+            conversation, relevant_articles = await asyncio.gather(
+                load_conversation,
+                self._prefetch_articles(message, cache_embedding)
+            )
+            if not conversation:
+                raise ValueError(f"Conversation {conversation_id} not found")
+
+            conversation_id = conversation["id"]
+            messages = [
+                {"role": msg["role"].lower(), "content": msg["content"]}
+                for msg in conversation["messages"]
+            ]
 
             # Add user message
             messages.append({"role": "user", "content": message})
 
-            
             # Prepare state
             state = {
                 "messages": messages,
-                "conversation_id": conversation_id
+                "conversation_id": conversation_id,
+                "relevant_articles": relevant_articles
             }
 
-            # Run the graph
-            result = self.graph.invoke(state)
-            # Save messages to database
-            async with db_client:
-                await db_client.add_message_to_conversation(
-                    conversation_id, "USER", message
-                )
-                await db_client.add_message_to_conversation(
-                    conversation_id, "ASSISTANT", result["messages"][-1]["content"]
-                )
-            
-            return {
+            # Run the graph, forwarding generation tokens as they arrive
+            result = state
+            async for mode, data in self.graph.astream(state, stream_mode=["messages", "values"]):
+                if mode == "values":
+                    result = data
+                    continue
+                chunk, metadata = data
+                if metadata.get("langgraph_node") == "generate_response" and chunk.content:
+                    yield {"type": "token", "content": chunk.content}
+
+            relevant_articles = result.get("relevant_articles", [])
+            if relevant_articles:
+                # Keep only the JSON-serializable parts of the ChromaDB query result
+                relevant_articles = {
+                    key: relevant_articles[key]
+                    for key in ("ids", "documents", "metadatas", "distances")
+                }
+
+            response = {
                 "response": result["messages"][-1]["content"],
-                "conversation_id": conversation_id,
-                "relevant_articles": result.get("relevant_articles", []),
+                "relevant_articles": relevant_articles,
                 "sources_used": result.get("sources_used", [])
             }
-            
+
+            # Writes happen off the response path
+            self._run_in_background(
+                self._persist_turn(conversation_id, message, response, cache_embedding, cache_language)
+            )
+
+            yield {"type": "done", **response, "conversation_id": conversation_id}
+
         except Exception as e:
             logger.error(f"Error in chat processing: {e}")
             raise e
 
+    async def chat(self, message: str, conversation_id: Optional[str] = None) -> Dict:
+        """Process a chat message and return response"""
+        async for event in self.chat_stream(message, conversation_id):
+            if event["type"] == "done":
+                event.pop("type")
+                return event
+
     async def get_conversation_history(self, conversation_id: str) -> Dict:
         """Get conversation history"""
         try:
-            async with db_client:
-                conversation = await db_client.get_conversation_with_messages(conversation_id)
-                if not conversation:
-                    return {"error": "Conversation not found"}
+            conversation = await db_client.get_conversation_with_messages(conversation_id)
+            if not conversation:
+                return {"error": "Conversation not found"}
                 
-                return {
-                    "conversation_id": conversation_id,
-                    "messages": [
-                        {
-                            "role": msg["role"].lower(),
-                            "content": msg["content"],
-                            "created_at": msg["createdAt"].isoformat()
-                        }
-                        for msg in conversation["messages"]
-                    ]
-                }
+            return {
+                "conversation_id": conversation_id,
+                "messages": [
+                    {
+                        "role": msg["role"].lower(),
+                        "content": msg["content"],
+                        "created_at": msg["createdAt"].isoformat()
+                    }
+                    for msg in conversation["messages"]
+                ]
+            }
         except Exception as e:
             logger.error(f"Error getting conversation history: {e}")
             return {"error": "Failed to get conversation history"}
\ No newline at end of file
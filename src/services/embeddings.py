@@ -1,54 +1,132 @@
 from sentence_transformers import SentenceTransformer
-from typing import List, Optional
+from typing import List, Optional, Union
+import logging
+import os
 import numpy as np
+import simsimd
+import torch
+
+logger = logging.getLogger(__name__)
+
+# "onnx" runs the int8-quantized ONNX export shipped with the model through ONNX Runtime,
+# "torch" the original PyTorch weights
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+# Celery workers default this to their share of the cores, see src/celery_app.py
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", os.cpu_count() or 1))
+# Opt-in torch.compile for the PyTorch backend, compiling costs seconds at startup
+EMBEDDING_TORCH_COMPILE = os.getenv("EMBEDDING_TORCH_COMPILE") == "1"
+
+
+def set_embedding_threads(num_threads: int = EMBED_THREADS):
+    """Size PyTorch's intra-op pool, forked workers may start with a single thread"""
+    torch.set_num_threads(num_threads)
+
+
+def _load_onnx_model(model_name: str) -> SentenceTransformer:
+    import onnxruntime
+
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = EMBED_THREADS
+    return SentenceTransformer(
+        model_name,
+        backend="onnx",
+        model_kwargs={
+            "file_name": EMBEDDING_ONNX_FILE,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options
+        }
+    )
+
+
+def _load_torch_model(model_name: str) -> SentenceTransformer:
+    # Fused scaled_dot_product_attention kernels instead of eager attention
+    model = SentenceTransformer(model_name, model_kwargs={"attn_implementation": "sdpa"})
+    if EMBEDDING_TORCH_COMPILE:
+        transformer = model[0]
+        transformer.auto_model = torch.compile(transformer.auto_model, dynamic=True)
+    return model
 
 
 class EmbeddingService:
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+        self.model = None
+        if EMBEDDING_BACKEND == "onnx":
+            try:
+                self.model = _load_onnx_model(model_name)
+            except Exception as e:
+                logger.warning(f"ONNX embedding backend unavailable, using PyTorch: {e}")
+        backend = "onnx"
+        if self.model is None:
+            self.model = _load_torch_model(model_name)
+            set_embedding_threads()
+            backend = "torch"
+        self.backend = backend
+        # Identifies which model produced an embedding, for caches shared across processes
+        self.model_id = f"{model_name}:{backend}"
+        self.model.eval()
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
 
-    def create_embedding(self, text: str) -> List[float]:
-        embedding = self.model.encode(text, normalize_embeddings=True)
-        return embedding.tolist()
+    # Embeddings stay float32 ndarrays, lists are only built where JSON needs them
+    def create_embedding(self, text: str) -> np.ndarray:
+        with torch.inference_mode():
+            return self.model.encode(
+                text,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
 
-    def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        embeddings = self.model.encode(texts, normalize_embeddings=True)
-        return embeddings.tolist()
+    def create_embeddings_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        # encode() already length-sorts its inputs, so each batch pads to similar lengths
+        with torch.inference_mode():
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
 
-    def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
-        arr1 = np.array(embedding1)
-        arr2 = np.array(embedding2)
-        return float(np.dot(arr1, arr2))
+    def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        # asarray is a no-op for the float32 arrays this service returns
+        arr1 = np.asarray(embedding1, dtype=np.float32)
+        arr2 = np.asarray(embedding2, dtype=np.float32)
+        return float(simsimd.dot(arr1, arr2))
 
-    def create_article_embedding(self, title: str, content: str) -> List[float]:
-        # Combine title and content with title weighted more heavily
-        combined_text = f"{title} {title} {content}"
-        return self.create_embedding(combined_text)
+    def create_article_embedding(self, title: str, content: str, title_weight: float = 0.7) -> np.ndarray:
+        # Title and content share one batched encode, then the normalized vectors are
+        # blended with the title weighted more heavily and renormalized
+        with torch.inference_mode():
+            embeddings = self.model.encode([title, content], normalize_embeddings=True, show_progress_bar=False)
+        combined = title_weight * embeddings[0] + (1 - title_weight) * embeddings[1]
+        combined /= np.linalg.norm(combined)
+        return combined
 
     def find_most_similar(
         self, 
-        query_embedding: List[float], 
-        candidate_embeddings: List[List[float]], 
+        query_embedding: np.ndarray, 
+        candidate_embeddings: Union[List[List[float]], np.ndarray], 
         threshold: float = 0.7
     ) -> List[tuple]:
         """
         Find most similar embeddings to query
         Returns list of (index, similarity_score) tuples
+        Candidates can be passed as a 2-D float32 ndarray to skip the list conversion
         """
-        similarities = []
-        query_arr = np.array(query_embedding)
-        
-        for i, candidate in enumerate(candidate_embeddings):
-            candidate_arr = np.array(candidate)
-            similarity = float(np.dot(query_arr, candidate_arr))
-            
-            if similarity >= threshold:
-                similarities.append((i, similarity))
-        
+        candidates = np.ascontiguousarray(candidate_embeddings, dtype=np.float32)
+        if candidates.size == 0:
+            return []
+        query_arr = np.asarray(query_embedding, dtype=np.float32)
+
+        # One SIMD kernel call scores every candidate
+        scores = np.asarray(simsimd.cdist(query_arr[np.newaxis, :], candidates, metric="dot"))[0]
+        indices = np.flatnonzero(scores >= threshold)
+
         # Sort by similarity score descending
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities
+        order = indices[np.argsort(-scores[indices], kind="stable")]
+        return list(zip(order.tolist(), scores[order].tolist()))
 
 
 # Global embedding service instance
@@ -1,10 +1,12 @@
 import httpx
-from bs4 import BeautifulSoup
-from datetime import datetime
+from selectolax.lexbor import LexborHTMLParser
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict
-import xml.etree.ElementTree as ET
+from lxml import etree
 from pydantic import BaseModel
 import asyncio
+import hashlib
 
 
 class NewsArticle(BaseModel):
@@ -14,62 +16,80 @@ class NewsArticle(BaseModel):
     published_at: datetime
 
 
+# Feeds come from the network, so never resolve entities or fetch DTDs
+RSS_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+
 class BBCNewsFetcher:
     def __init__(self, rss_url: str = "https://feeds.bbci.co.uk/news/rss.xml"):
         self.rss_url = rss_url
-        self.session = httpx.AsyncClient()
+        # One pooled client for the fetcher's lifetime, keep-alive connections are
+        # shared by the concurrent article fetches and only closed in close()
+        self.session = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            timeout=httpx.Timeout(10.0)
+        )
 
     async def fetch_rss_feed(self) -> List[Dict]:
-        async with self.session as client:
-            response = await client.get(self.rss_url)
+        response = await self.session.get(self.rss_url)
+        response.raise_for_status()
+        
+        # Parse the raw bytes so lxml honours the feed's declared encoding
+        root = etree.fromstring(response.content, RSS_PARSER)
+        items = []
+        
+        for item in root.iterfind(".//item"):
+            items.append({
+                "title": item.findtext("title", ""),
+                "link": item.findtext("link", ""),
+                "pub_date": item.findtext("pubDate", ""),
+                "description": item.findtext("description", "")
+            })
+        
+        return items
+
+    async def fetch_feed_fingerprint(self) -> str:
+        """
+        Cheap change marker for the RSS feed: ETag or Last-Modified from a HEAD request,
+        falling back to a hash of the feed body when the server sends neither
+        """
+        response = await self.session.head(self.rss_url)
+        response.raise_for_status()
+
+        fingerprint = response.headers.get("etag") or response.headers.get("last-modified")
+        if fingerprint:
+            return fingerprint
+
+        response = await self.session.get(self.rss_url)
+        response.raise_for_status()
+        return hashlib.sha256(response.content).hexdigest()
+
+    async def fetch_article_content(self, url: str) -> str:
+        try:
+            response = await self.session.get(url)
             response.raise_for_status()
             
-            root = ET.fromstring(response.text)
-            items = []
+            tree = LexborHTMLParser(response.text)
             
-            for item in root.findall(".//item"):
-                title = item.find("title").text if item.find("title") is not None else ""
-                link = item.find("link").text if item.find("link") is not None else ""
-                pub_date = item.find("pubDate").text if item.find("pubDate") is not None else ""
-                description = item.find("description").text if item.find("description") is not None else ""
-                
-                items.append({
-                    "title": title,
-                    "link": link,
-                    "pub_date": pub_date,
-                    "description": description
-                })
+            # BBC specific content extraction
+            content_blocks = tree.css('div[data-component="text-block"]')
+            if not content_blocks:
+                # Fallback to paragraph tags
+                content_blocks = tree.css('p')
             
-            return items
-
-    async def fetch_article_content(self, url: str) -> str:
-        try:
-            async with self.session as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # BBC specific content extraction
-                content_blocks = soup.find_all('div', {'data-component': 'text-block'})
-                if not content_blocks:
-                    # Fallback to paragraph tags
-                    content_blocks = soup.find_all('p')
-                
-                content = " ".join([block.get_text().strip() for block in content_blocks])
-                return content
+            content = " ".join([block.text().strip() for block in content_blocks])
+            return content
         except Exception as e:
             print(f"Error fetching content from {url}: {e}")
             return ""
 
     def parse_date(self, date_str: str) -> datetime:
+        # RSS pubDate is RFC 822, parsed in one pass for both GMT and numeric offsets
         try:
-            return datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %Z")
-        except ValueError:
-            try:
-                return datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %z")
-            except ValueError:
-                return datetime.now()
+            return parsedate_to_datetime(date_str)
+        except (TypeError, ValueError):
+            return datetime.now(timezone.utc)
 
     async def fetch_latest_news(self, limit: int = 10) -> List[NewsArticle]:
         rss_items = await self.fetch_rss_feed()
@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Optional
 import asyncio
 import logging
 import json
+import os
+import numpy as np
 from datetime import datetime, timedelta
 
 from src.services.news_fetcher import BBCNewsFetcher, NewsArticle
@@ -12,6 +14,9 @@ from src.database.client import db_client
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Articles translated at once, each one is mostly waiting on OpenAI
+NEWS_CONCURRENCY = int(os.getenv("NEWS_CONCURRENCY", 5))
+
 
 class DailyNewsProcessor:
     def __init__(self):
@@ -30,26 +35,13 @@ class DailyNewsProcessor:
             articles = await self.news_fetcher.fetch_latest_news(limit)
             logger.info(f"Fetched {len(articles)} articles")
             
-            processed_articles = []
-            
             async with db_client:
-                for article in articles:
-                    try:
-                        # Check if article already exists
-                        existing = await db_client.get_news_article_by_url(article.url)
-                        if existing:
-                            logger.info(f"Article already exists: {article.title[:50]}...")
-                            continue
-                        
-                        # Process the article
-                        processed_article = await self._process_single_article(article)
-                        if processed_article:
-                            processed_articles.append(processed_article)
-                            logger.info(f"Processed: {article.title[:50]}...")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing article {article.title[:50]}: {e}")
-                        continue
+                # Drop already stored articles with one lookup instead of one per article
+                existing = await db_client.filter_existing_urls([article.url for article in articles])
+                new_articles = [article for article in articles if article.url not in existing]
+                logger.info(f"{len(articles) - len(new_articles)} articles already exist")
+
+                processed_articles = await self.process_articles(new_articles)
             
             logger.info(f"Successfully processed {len(processed_articles)} new articles")
             return processed_articles
@@ -57,23 +49,67 @@ class DailyNewsProcessor:
         except Exception as e:
             logger.error(f"Error in daily news processing: {e}")
             raise
-        finally:
-            await self.news_fetcher.close()
 
-    async def _process_single_article(self, article: NewsArticle) -> dict:
+    async def process_articles(self, articles: List[NewsArticle]) -> List[dict]:
         """
-        Process a single article: translate, create embeddings, and store
+        Translate, embed, and store articles that are not in the database yet
+        Articles whose translation or storing fails are logged and left out
         """
+        if not articles:
+            return []
+
+        # Article bodies are I/O bound (OpenAI), so several are translated at once
+        semaphore = asyncio.Semaphore(NEWS_CONCURRENCY)
+
+        async def translate_content(article: NewsArticle) -> str:
+            async with semaphore:
+                return await self.translator.translate_content(article.content)
+
+        async def translate_contents() -> List:
+            return await asyncio.gather(
+                *(translate_content(article) for article in articles),
+                return_exceptions=True
+            )
+
+        # All titles go to the translator in a single request, sent alongside the bodies
+        titles_fr, contents_fr = await asyncio.gather(
+            self.translator.translate_titles_batch([article.title for article in articles]),
+            translate_contents()
+        )
+
+        translated = [
+            (article, title_fr, content_fr)
+            for article, title_fr, content_fr in zip(articles, titles_fr, contents_fr)
+            if not isinstance(content_fr, BaseException)
+        ]
+        for article, content_fr in zip(articles, contents_fr):
+            if isinstance(content_fr, BaseException):
+                logger.error(f"Error translating article {article.title[:50]}: {content_fr}")
+
+        # One batched encode for the whole run instead of one model call per article
+        embeddings = []
+        if translated:
+            embeddings = await asyncio.to_thread(
+                embedding_service.create_embeddings_batch,
+                [f"{title_fr} {content_fr}" for _, title_fr, content_fr in translated]
+            )
+
+        processed_articles = []
+        for (article, title_fr, content_fr), embedding in zip(translated, embeddings):
+            stored = await self._store_article(article, title_fr, content_fr, embedding)
+            if stored:
+                processed_articles.append(stored)
+        return processed_articles
+
+    async def _store_article(
+        self,
+        article: NewsArticle,
+        title_fr: str,
+        content_fr: str,
+        embedding: np.ndarray
+    ) -> Optional[dict]:
+        """Store a translated and embedded article, returns None if storing failed"""
         try:
-            # Translate to French B1 level
-            title_fr = await self.translator.translate_title(article.title)
-            content_fr = await self.translator.translate_content(article.content)
-            
-            # Create embeddings for the French version (better for French conversations)
-            combined_text = f"{title_fr} {content_fr}"
-            embedding = embedding_service.create_embedding(combined_text)
-            
-            # Store in database
             db_article = await db_client.create_news_article(
                 title=article.title,
                 content=article.content,
@@ -83,6 +119,7 @@ class DailyNewsProcessor:
                 content_fr=content_fr,
                 embedding=embedding
             )
+            logger.info(f"Processed: {article.title[:50]}...")
             return {
                 'id': db_article["id"],
                 'title': article.title,
@@ -92,7 +129,7 @@ class DailyNewsProcessor:
             }
             
         except Exception as e:
-            logger.error(f"Error processing single article: {e}")
+            logger.error(f"Error processing article {article.title[:50]}: {e}")
             return None
 
     async def get_articles_for_conversation(self, query: str, limit: int = 3) -> List[dict]:
@@ -100,23 +137,28 @@ class DailyNewsProcessor:
         Get relevant articles for conversation based on query using ChromaDB's vector search
         """
         try:
-            async with db_client:
-                # Use ChromaDB's built-in semantic search with query text
-                relevant_articles = await db_client.search_articles_by_similarity(
-                    query_text=query,
-                    limit=limit,
-                    similarity_threshold=0.3
-                )
+            # Use ChromaDB's built-in semantic search with query text
+            relevant_articles = await db_client.search_articles_by_similarity(
+                query_text=query,
+                limit=limit,
+                similarity_threshold=0.3
+            )
                 
-                return relevant_articles
+            return relevant_articles
                 
         except Exception as e:
             logger.error(f"Error getting articles for conversation: {e}")
             return []
 
-    def get_articles_for_conversation_sync(self, query: str, limit: int = 3) -> List[dict]:
+    def get_articles_for_conversation_sync(
+        self,
+        query: str,
+        limit: int = 3,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[dict]:
         """
         Synchronous version for LangGraph nodes - uses ChromaDB's synchronous search
+        A precomputed query_embedding skips ChromaDB's own query embedding
         """
         try:
             logger.info(f"Sync article search for: {query}")
@@ -125,6 +167,7 @@ class DailyNewsProcessor:
             # breakpoint()  # Debug point - use 'python debug_news_processor.py' to test
             relevant_articles = db_client.search_articles_by_similarity_sync(
                 query_text=query,
+                query_embedding=query_embedding,
                 limit=limit,
                 similarity_threshold=0.3
             )
@@ -1,13 +1,57 @@
 from openai import AsyncOpenAI
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import asyncio
+import json
 import os
+import tiktoken
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Cheaper and faster than gpt-3.5-turbo for short translations
+TRANSLATION_MODEL = os.getenv("TRANSLATION_MODEL", "gpt-4o-mini")
+
+# Input tokens per content chunk, B1 French runs longer than the English source
+# so this keeps each translation well inside the 2000 token completion limit
+CONTENT_CHUNK_TOKENS = 1000
+
+# System prompts are module constants, defined once and sent byte for byte the same
+# with every request instead of being rebuilt per call
+SYSTEM_PROMPT = """You are a professional translator specializing in French B1 level translations for language learners.
+
+B1 Level Guidelines:
+- Use simple, common vocabulary (avoid technical or advanced terms)
+- Keep sentences clear and direct
+- Use present, past simple, and future tenses primarily
+- Avoid subjunctive mood and complex grammar
+- Replace difficult words with simpler synonyms
+- Break long sentences into shorter ones
+- Focus on clarity over literary style
+
+Your task is to translate the given text to French B1 level while maintaining the original meaning and keeping it engaging for intermediate French learners."""
+
+TITLES_BATCH_SYSTEM_PROMPT = """You are a professional translator specializing in French B1 level translations for language learners.
+
+B1 Level Guidelines:
+- Use simple, common vocabulary (avoid technical or advanced terms)
+- Keep sentences clear and direct
+- Avoid subjunctive mood and complex grammar
+
+You receive a JSON array of English news titles. Return ONLY a JSON object of the form {"translations": [...]} holding their French B1 translations, in the same order and with the same number of items."""
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """Tokenizer for the model, loaded once per process"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
 
 class FrenchB1Translator:
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
+    def __init__(self, api_key: Optional[str] = None, model: str = TRANSLATION_MODEL):
         self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
         self.model = model
 
@@ -20,21 +64,9 @@ class FrenchB1Translator:
         - Avoid complex grammar structures
         - Clear, direct sentences
         - Familiar topics and concrete concepts
+        Raises on API errors, callers decide whether to keep the original or skip it
         """
         
-        system_prompt = """You are a professional translator specializing in French B1 level translations for language learners.
-
-B1 Level Guidelines:
-- Use simple, common vocabulary (avoid technical or advanced terms)
-- Keep sentences clear and direct
-- Use present, past simple, and future tenses primarily
-- Avoid subjunctive mood and complex grammar
-- Replace difficult words with simpler synonyms
-- Break long sentences into shorter ones
-- Focus on clarity over literary style
-
-Your task is to translate the given text to French B1 level while maintaining the original meaning and keeping it engaging for intermediate French learners."""
-
         user_prompt = f"""Translate this {content_type} to French B1 level:
 
 {text}
@@ -45,58 +77,127 @@ Remember to:
 3. Maintain the original meaning
 4. Make it engaging for language learners"""
 
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.3,
+            max_tokens=2000
+        )
+        
+        return response.choices[0].message.content.strip()
+
+    async def translate_title(self, title: str) -> str:
+        """Translate a news title to French B1 level"""
+        return await self.translate_to_french_b1(title, "news title")
+
+    async def translate_titles_batch(self, titles: List[str]) -> List[str]:
+        """
+        Translate several news titles to French B1 level in a single request
+        Falls back to one request per title if the batch answer can't be used,
+        titles that still fail keep the English original
+        """
+        if not titles:
+            return []
+
         try:
             response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
+                    {"role": "system", "content": TITLES_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": json.dumps(titles, ensure_ascii=False)}
                 ],
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=100 * len(titles),
+                response_format={"type": "json_object"}
             )
-            
-            return response.choices[0].message.content.strip()
-        
+
+            translations = json.loads(response.choices[0].message.content).get("translations")
+            if (
+                isinstance(translations, list)
+                and len(translations) == len(titles)
+                and all(isinstance(title, str) for title in translations)
+            ):
+                return [title.strip() for title in translations]
+            print("Batch title translation returned an unexpected shape, translating one by one")
         except Exception as e:
-            print(f"Translation error: {e}")
-            return f"Translation error: {str(e)}"
+            print(f"Batch title translation error: {e}")
 
-    async def translate_title(self, title: str) -> str:
-        """Translate a news title to French B1 level"""
-        return await self.translate_to_french_b1(title, "news title")
+        translations = await asyncio.gather(
+            *(self.translate_title(title) for title in titles),
+            return_exceptions=True
+        )
+        titles_fr = []
+        for title, title_fr in zip(titles, translations):
+            if isinstance(title_fr, BaseException):
+                print(f"Title translation error, keeping the original: {title_fr}")
+                title_fr = title
+            titles_fr.append(title_fr)
+        return titles_fr
 
     async def translate_content(self, content: str) -> str:
         """Translate news content to French B1 level"""
-        # Split long content into chunks if necessary
-        if len(content) > 3000:
-            chunks = self._split_content(content, 3000)
-            translated_chunks = []
-            
-            for chunk in chunks:
-                translated_chunk = await self.translate_to_french_b1(chunk, "news article")
-                translated_chunks.append(translated_chunk)
-            
+        # Split long content into chunks if necessary, chunks are translated concurrently
+        chunks = self._split_content(content, CONTENT_CHUNK_TOKENS)
+        if len(chunks) > 1:
+            translated_chunks = await asyncio.gather(
+                *(self.translate_to_french_b1(chunk, "news article") for chunk in chunks)
+            )
             return " ".join(translated_chunks)
         else:
             return await self.translate_to_french_b1(content, "news article")
 
-    def _split_content(self, content: str, max_length: int) -> list:
-        """Split content into chunks at sentence boundaries"""
+    async def translate_article(self, title: str, content: str) -> Tuple[str, str]:
+        """
+        Translate an article's title and content concurrently
+        Whichever translation fails falls back to the English original
+        """
+        title_fr, content_fr = await asyncio.gather(
+            self.translate_title(title),
+            self.translate_content(content),
+            return_exceptions=True
+        )
+
+        if isinstance(title_fr, BaseException):
+            print(f"Title translation error, keeping the original: {title_fr}")
+            title_fr = title
+        if isinstance(content_fr, BaseException):
+            print(f"Content translation error, keeping the original: {content_fr}")
+            content_fr = content
+
+        return title_fr, content_fr
+
+    def _split_content(self, content: str, max_tokens: int) -> list:
+        """Split content into chunks of at most max_tokens tokens at sentence boundaries"""
+        encoding = _get_encoding(self.model)
+        if len(encoding.encode_ordinary(content)) <= max_tokens:
+            return [content]
+
         sentences = content.split('. ')
         chunks = []
         current_chunk = []
         current_length = 0
         
-        for sentence in sentences:
-            sentence_length = len(sentence)
-            if current_length + sentence_length > max_length and current_chunk:
+        for sentence, tokens in zip(sentences, encoding.encode_ordinary_batch(sentences)):
+            sentence_length = len(tokens) + 1  # +1 for '. '
+            if sentence_length > max_tokens:
+                # A single sentence over the budget is cut on token boundaries
+                if current_chunk:
+                    chunks.append('. '.join(current_chunk) + '.')
+                    current_chunk = []
+                    current_length = 0
+                chunks.extend(
+                    encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)
+                )
+            elif current_length + sentence_length > max_tokens and current_chunk:
                 chunks.append('. '.join(current_chunk) + '.')
                 current_chunk = [sentence]
                 current_length = sentence_length
             else:
                 current_chunk.append(sentence)
-                current_length += sentence_length + 2  # +2 for '. '
+                current_length += sentence_length
         
         if current_chunk:
             chunks.append('. '.join(current_chunk))
@@ -1 +1,22 @@
 # Tasks package
+import asyncio
+from typing import Any, Awaitable, Optional
+
+# One event loop per worker process, shared by every task it runs so that
+# long-lived async clients keep their connection pools between tasks
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def reset_event_loop() -> asyncio.AbstractEventLoop:
+    """Create this process's task event loop, called again in each prefork child"""
+    global _loop
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion on the worker's event loop"""
+    if _loop is None or _loop.is_closed():
+        reset_event_loop()
+    return _loop.run_until_complete(coro)
@@ -1,8 +1,8 @@
 from celery import current_app as celery_app
 from celery.utils.log import get_task_logger
 from datetime import datetime, timedelta
-import asyncio
 
+from src.tasks import run_async
 from src.database.client import db_client
 
 logger = get_task_logger(__name__)
@@ -16,7 +16,7 @@ def cleanup_old_articles(self, days_old: int = 30):
     logger.info(f"🧹 Starting cleanup of articles older than {days_old} days")
     
     try:
-        result = asyncio.run(_cleanup_old_articles_async(days_old))
+        result = run_async(_cleanup_old_articles_async(days_old))
         
         logger.info(f"✅ Cleanup completed. Removed {result['deleted_count']} articles")
         return {
@@ -58,7 +58,7 @@ def health_check(self):
     logger.info("🏥 Performing system health check")
     
     try:
-        result = asyncio.run(_health_check_async())
+        result = run_async(_health_check_async())
         
         logger.info(f"✅ Health check completed. Status: {result['status']}")
         return result
@@ -94,7 +94,7 @@ async def _health_check_async():
     try:
         from src.services.embeddings import embedding_service
         test_embedding = embedding_service.create_embedding("test")
-        if test_embedding:
+        if test_embedding.size:
             checks['embedding_service'] = True
             logger.info("✅ Embedding service: OK")
     except Exception as e:
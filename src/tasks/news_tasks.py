@@ -1,29 +1,112 @@
 from celery import current_app as celery_app
 from celery.utils.log import get_task_logger
 from typing import Dict, List
-import asyncio
 from datetime import datetime
 
 from src.services.news_processor import news_processor
 from src.services.news_fetcher import BBCNewsFetcher
 from src.services.translator import FrenchB1Translator
 from src.services.embeddings import embedding_service
+from src.services.cache import invalidate_recent_news_cache, redis_client
 from src.database.client import db_client
+from src.tasks import run_async
 
 logger = get_task_logger(__name__)
 
+# Kept for the worker's lifetime so HTTP and OpenAI connection pools survive between tasks
+news_fetcher = BBCNewsFetcher()
+translator = FrenchB1Translator()
+
+# News sources checked for changes, by source id
+NEWS_SOURCES = {
+    'bbc': news_fetcher,
+}
+
+# Redis keys for change detection: fingerprints of the feed versions already processed,
+# and the latest fingerprints seen by check_news_sources that still have to be
+SOURCE_FINGERPRINTS_KEY = 'news:sources:fingerprint'
+PENDING_FINGERPRINTS_KEY = 'news:sources:pending'
+
+# Set while a change-triggered fetch is queued or running, so changes collapse into it.
+# The expiry outlasts a run with all its retries, a lost task only blocks detection until then
+FETCH_QUEUED_KEY = 'news:fetch:queued'
+FETCH_QUEUED_TTL = 1800
+
+
+@celery_app.task(bind=True, name='src.tasks.news_tasks.check_news_sources')
+def check_news_sources(self):
+    """
+    Check news sources for changes and queue news processing only when one changed
+    Runs every minute, replacing the fixed-interval fetch
+    """
+    try:
+        changed_sources = run_async(_check_news_sources_async())
+        
+        queued = False
+        # Only the first pending change queues a fetch, later ones collapse into it
+        if changed_sources and redis_client.set(FETCH_QUEUED_KEY, 1, nx=True, ex=FETCH_QUEUED_TTL):
+            fetch_and_process_news.delay()
+            queued = True
+        
+        if changed_sources:
+            logger.info(f"📡 Sources changed: {changed_sources} - fetch queued: {queued}")
+        
+        return {
+            'status': 'success',
+            'changed_sources': changed_sources,
+            'fetch_queued': queued,
+            'timestamp': datetime.now().isoformat()
+        }
+        
+    except Exception as exc:
+        logger.error(f"❌ News source check failed: {str(exc)}")
+        return {
+            'status': 'error',
+            'error': str(exc),
+            'timestamp': datetime.now().isoformat()
+        }
+
+
+async def _check_news_sources_async() -> List[str]:
+    """
+    Compare each source's feed fingerprint with the last processed one
+    The new fingerprint is only recorded as pending, a successful fetch commits it
+    """
+    changed_sources = []
+    
+    for source_id, fetcher in NEWS_SOURCES.items():
+        fingerprint = await fetcher.fetch_feed_fingerprint()
+        
+        last_fingerprint = redis_client.hget(SOURCE_FINGERPRINTS_KEY, source_id)
+        if last_fingerprint is None or last_fingerprint.decode() != fingerprint:
+            redis_client.hset(PENDING_FINGERPRINTS_KEY, source_id, fingerprint)
+            changed_sources.append(source_id)
+    
+    return changed_sources
+
 
 @celery_app.task(bind=True, name='src.tasks.news_tasks.fetch_and_process_news')
 def fetch_and_process_news(self, limit: int = 5):
     """
     Fetch and process news articles in background
-    Runs every 30 seconds to demonstrate Celery scheduling
+    Queued by check_news_sources when a source changed, or triggered manually
     """
     logger.info(f"🚀 Starting news processing task - limit: {limit}")
     
+    # Feed versions seen before this run starts are the ones it processes
+    pending_fingerprints = redis_client.hgetall(PENDING_FINGERPRINTS_KEY)
+    
     try:
-        # Run the async function in a new event loop
-        result = asyncio.run(_process_news_async(limit))
+        result = run_async(_process_news_async(limit))
+
+        # Only now are those versions done, changes seen since then queue a new run
+        if pending_fingerprints:
+            redis_client.hset(SOURCE_FINGERPRINTS_KEY, mapping=pending_fingerprints)
+        redis_client.delete(FETCH_QUEUED_KEY)
+
+        # Cached /news lists are stale once new articles are stored
+        if result['processed_count']:
+            invalidate_recent_news_cache()
         
         logger.info(f"✅ News processing completed successfully. Processed {result['processed_count']} new articles")
         return {
@@ -36,6 +119,9 @@ def fetch_and_process_news(self, limit: int = 5):
         
     except Exception as exc:
         logger.error(f"❌ News processing failed: {str(exc)}")
+        if self.request.retries >= self.max_retries:
+            # Out of retries, the fingerprints stay pending so the next check queues a fresh run
+            redis_client.delete(FETCH_QUEUED_KEY)
         # Retry with exponential backoff
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
@@ -44,80 +130,35 @@ async def _process_news_async(limit: int) -> Dict:
     """
     Async helper function to process news
     """
-    news_fetcher = BBCNewsFetcher()
-    translator = FrenchB1Translator()
-    
     processed_count = 0
     skipped_count = 0
     total_fetched = 0
     
-    try:
-        logger.info("📰 Fetching latest news from BBC...")
-        articles = await news_fetcher.fetch_latest_news(limit)
-        total_fetched = len(articles)
-        logger.info(f"📥 Fetched {total_fetched} articles from BBC")
-        
-        async with db_client:
-            for i, article in enumerate(articles, 1):
-                try:
-                    logger.info(f"🔄 Processing article {i}/{total_fetched}: {article.title[:50]}...")
-                    
-                    # Check if article already exists
-                    existing = await db_client.get_news_article_by_url(article.url)
-                    if existing:
-                        logger.info(f"⏭️  Article already exists, skipping: {article.title[:30]}...")
-                        skipped_count += 1
-                        continue
-                    
-                    # Process the article
-                    await _process_single_article_async(article, translator)
-                    processed_count += 1
-                    logger.info(f"✅ Successfully processed: {article.title[:30]}...")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error processing article {article.title[:30]}: {e}")
-                    continue
-        
-        return {
-            'processed_count': processed_count,
-            'skipped_count': skipped_count,
-            'total_fetched': total_fetched
-        }
-        
-    finally:
-        await news_fetcher.close()
-
-
-async def _process_single_article_async(article, translator):
-    """
-    Process a single article: translate, create embeddings, and store
-    """
-    try:
-        # Translate to French B1 level
-        logger.info(f"🔤 Translating article: {article.title[:30]}...")
-        title_fr = await translator.translate_title(article.title)
-        content_fr = await translator.translate_content(article.content)
-        
-        # Create embeddings for the French version
-        logger.info(f"🧮 Creating embeddings for: {article.title[:30]}...")
-        combined_text = f"{title_fr} {content_fr}"
-        embedding = embedding_service.create_embedding(combined_text)
-        
-        # Store in database
-        logger.info(f"💾 Storing article in database: {article.title[:30]}...")
-        await db_client.create_news_article(
-            title=article.title,
-            content=article.content,
-            url=article.url,
-            published_at=article.published_at,
-            title_fr=title_fr,
-            content_fr=content_fr,
-            embedding=embedding
-        )
+    logger.info("📰 Fetching latest news from BBC...")
+    articles = await news_fetcher.fetch_latest_news(limit)
+    total_fetched = len(articles)
+    logger.info(f"📥 Fetched {total_fetched} articles from BBC")
+    
+    async with db_client:
+        # One lookup for every fetched URL instead of one per article
+        existing_urls = await db_client.filter_existing_urls([article.url for article in articles])
+        new_articles = [article for article in articles if article.url not in existing_urls]
+        skipped_count = total_fetched - len(new_articles)
+        if skipped_count:
+            logger.info(f"⏭️  Skipping {skipped_count} articles that already exist")
         
-    except Exception as e:
-        logger.error(f"❌ Error processing single article: {e}")
-        raise
+        # Batched title translation and embedding, shared with the API path
+        logger.info(f"🔄 Processing {len(new_articles)} new articles...")
+        processed = await news_processor.process_articles(new_articles)
+        processed_count = len(processed)
+        if processed_count < len(new_articles):
+            logger.error(f"❌ {len(new_articles) - processed_count} articles failed to process")
+    
+    return {
+        'processed_count': processed_count,
+        'skipped_count': skipped_count,
+        'total_fetched': total_fetched
+    }
 
 
 @celery_app.task(bind=True, name='src.tasks.news_tasks.translate_article')
@@ -128,7 +169,7 @@ def translate_article(self, article_data: Dict):
     logger.info(f"🔤 Translating article: {article_data['title'][:50]}...")
     
     try:
-        result = asyncio.run(_translate_article_async(article_data))
+        result = run_async(_translate_article_async(article_data))
         logger.info(f"✅ Translation completed for: {article_data['title'][:30]}...")
         return result
         
@@ -141,10 +182,7 @@ async def _translate_article_async(article_data: Dict) -> Dict:
     """
     Async helper for article translation
     """
-    translator = FrenchB1Translator()
-    
-    title_fr = await translator.translate_title(article_data['title'])
-    content_fr = await translator.translate_content(article_data['content'])
+    title_fr, content_fr = await translator.translate_article(article_data['title'], article_data['content'])
     
     return {
         'title_fr': title_fr,
@@ -165,7 +203,8 @@ def create_embeddings(self, text_data: Dict):
         embedding = embedding_service.create_embedding(combined_text)
         
         return {
-            'embedding': embedding,
+            # Task results are serialized, so the array becomes a list here
+            'embedding': embedding.tolist(),
             'url': text_data['url']
         }
         
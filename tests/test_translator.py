@@ -0,0 +1,47 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from src.services.translator import FrenchB1Translator
+
+
+def _completion(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class TranslateArticleTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.translator = FrenchB1Translator(api_key="test")
+        # Short content is a single chunk, this skips loading the tokenizer
+        self.translator._split_content = lambda content, max_tokens: [content]
+
+    def _fail_on(self, content_type: str):
+        async def create(**kwargs):
+            user_prompt = kwargs["messages"][-1]["content"]
+            if f"Translate this {content_type} " in user_prompt:
+                raise RuntimeError("API down")
+            return _completion("Texte traduit")
+
+        self.translator.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock(side_effect=create)))
+        )
+
+    async def test_failed_content_keeps_english_original(self):
+        self._fail_on("news article")
+
+        title_fr, content_fr = await self.translator.translate_article("Title", "English content.")
+
+        self.assertEqual(title_fr, "Texte traduit")
+        self.assertEqual(content_fr, "English content.")
+
+    async def test_failed_title_keeps_english_original(self):
+        self._fail_on("news title")
+
+        title_fr, content_fr = await self.translator.translate_article("Title", "English content.")
+
+        self.assertEqual(title_fr, "Title")
+        self.assertEqual(content_fr, "Texte traduit")
+
+
+if __name__ == "__main__":
+    unittest.main()